@@ -0,0 +1,207 @@
+"""Command line entry point.
+
+Keep module level imports to the standard library and light app.utils
+modules: the query command must start without SQLModel or Textual, so the
+database layer is only imported by the commands that need it.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from app.utils.config import EXPORT_FORMATS, IMPORT_BATCH_SIZE, IMPORT_FORMATS
+from app.utils.logger import logger
+from app.utils.User_Error import UserError
+
+QUERY_FORMATS = ("table", "json", "csv")
+
+
+def _guess_format(path: str, fmt: str | None) -> str:
+    if fmt:
+        return fmt
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if extension == ".parquet":
+        return "parquet"
+    return "csv"
+
+
+def _init_db() -> bool:
+    from app.utils.dbo import init_db
+
+    try:
+        init_db()
+        return True
+    except Exception as e:
+        logger.error(f"Failed to initialize the database: {e}")
+        print("Failed to initialize the database.", file=sys.stderr)
+        return False
+
+
+def cmd_import(args: argparse.Namespace) -> int:
+    from sqlmodel import Session
+    from app.utils.bulk_import import import_users, read_rows
+    from app.utils.dbo import engine
+
+    if not _init_db():
+        return 1
+
+    fmt = _guess_format(args.path, args.format)
+    with Session(engine) as session:
+        try:
+            report = import_users(session, read_rows(args.path, fmt), batch_size=args.batch_size)
+        except (OSError, ValueError) as e:
+            logger.error(f"Error reading import file {args.path}: {e}")
+            print(f"Import failed: {e}", file=sys.stderr)
+            return 1
+
+    for conflict in report.conflicts:
+        print(f"row {conflict.line}: {conflict.username or '<missing>'}: {conflict.reason}", file=sys.stderr)
+    print(f"Imported {report.imported} accounts, {len(report.conflicts)} skipped, "
+          f"{report.elapsed:.2f}s ({report.rows_per_second:.0f} rows/sec)")
+    return 0
+
+
+def cmd_export(args: argparse.Namespace) -> int:
+    from sqlmodel import Session
+    from app.utils.bulk_export import export_users
+    from app.utils.dbo import engine
+
+    if not _init_db():
+        return 1
+
+    fmt = _guess_format(args.path, args.format)
+    with Session(engine) as session:
+        try:
+            count = export_users(session, args.path, fmt, rank=args.rank, search_query=args.search)
+        except (UserError, OSError) as e:
+            logger.error(f"Error exporting to {args.path}: {e}")
+            print(f"Export failed: {e}", file=sys.stderr)
+            return 1
+
+    if args.path != "-":
+        print(f"Exported {count} accounts to {args.path}")
+    return 0
+
+
+def cmd_query(args: argparse.Namespace) -> int:
+    import sqlite3
+    from app.utils.quick_query import QUERY_COLUMNS, connect, users_by_party, users_by_rank, users_by_username
+
+    try:
+        conn = connect()
+    except sqlite3.OperationalError as e:
+        print(f"Could not open the database: {e}", file=sys.stderr)
+        return 1
+    try:
+        if args.rank:
+            rows = users_by_rank(conn, args.rank)
+        elif args.party:
+            rows = users_by_party(conn, args.party.split(","))
+        else:
+            rows = users_by_username(conn, args.search or "")
+    except (ValueError, sqlite3.Error) as e:
+        logger.error(f"Error in query command: {e}")
+        print(f"Query failed: {e}", file=sys.stderr)
+        return 1
+    finally:
+        conn.close()
+
+    _print_table(rows, QUERY_COLUMNS, args.format)
+    return 0
+
+
+def _print_table(rows: list, columns: tuple[str, ...], fmt: str) -> None:
+    """Write mapping-like rows to stdout as an aligned table, JSON or CSV."""
+    if fmt == "json":
+        json.dump([{c: row[c] for c in columns} for row in rows], sys.stdout, indent=2)
+        print()
+    elif fmt == "csv":
+        writer = csv.writer(sys.stdout)
+        writer.writerow(columns)
+        writer.writerows(tuple(row[c] for c in columns) for row in rows)
+    else:
+        shown = tuple(c for c in columns if c not in ("id", "rank_value"))
+        table = [shown] + [tuple("" if row[c] is None else str(row[c]) for c in shown) for row in rows]
+        widths = [max(len(line[i]) for line in table) for i in range(len(shown))]
+        for line in table:
+            print("  ".join(value.ljust(width) for value, width in zip(line, widths)).rstrip())
+
+
+def cmd_assign(args: argparse.Namespace) -> int:
+    from sqlmodel import Session
+    from app.utils.dbo import engine
+    from app.utils.party import assign_party_accounts, party_rank_values
+    from app.utils.rank_utils import match_rank
+
+    parties = []
+    for party in args.parties:
+        ranks = [match_rank(rank) or rank.strip() for rank in party.split(",")]
+        try:
+            parties.append(party_rank_values(ranks))
+        except ValueError as e:
+            print(f"Assign failed: {e}", file=sys.stderr)
+            return 1
+
+    if not _init_db():
+        return 1
+    with Session(engine) as session:
+        accounts = assign_party_accounts(session, parties)
+
+    rows = []
+    for party, user in zip(args.parties, accounts):
+        row = {"party": party, "username": None, "password": None, "uid": None, "level": None, "rank": None}
+        if user is not None:
+            row.update(username=user.username, password=user.password, uid=user.uid, level=user.level, rank=user.rank)
+        rows.append(row)
+    _print_table(rows, ("party", "username", "password", "uid", "level", "rank"), args.format)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="rivals-smurf", description="Command line tools for the Rivals Smurf Tracker database.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser("import", help="Bulk import accounts from a CSV or JSONL file.")
+    import_parser.add_argument("path", help="File with username, password, rank and optional uid, level fields.")
+    import_parser.add_argument("--format", choices=IMPORT_FORMATS, help="Input format (default: from the file extension).")
+    import_parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE, help="Rows inserted per transaction.")
+    import_parser.set_defaults(func=cmd_import)
+
+    export_parser = commands.add_parser("export", help="Stream accounts to a CSV, JSONL or Parquet file.")
+    export_parser.add_argument("path", help="Output file, or - for stdout.")
+    export_parser.add_argument("--format", choices=EXPORT_FORMATS, help="Output format (default: from the file extension).")
+    export_parser.add_argument("--rank", help="Only export accounts that can queue with this rank.")
+    export_parser.add_argument("--search", help="Only export accounts whose username contains this text.")
+    export_parser.set_defaults(func=cmd_export)
+
+    query_parser = commands.add_parser("query", help="Look up accounts without starting the TUI.")
+    query_filter = query_parser.add_mutually_exclusive_group(required=True)
+    query_filter.add_argument("--rank", help="List accounts that can queue with this rank, e.g. \"Gold 2\".")
+    query_filter.add_argument("--search", help="List accounts whose username contains this text.")
+    query_filter.add_argument("--party", help="List accounts that can queue with every rank, e.g. \"Gold 3,Platinum 1\".")
+    query_parser.add_argument("--format", choices=QUERY_FORMATS, default="table", help="Output format.")
+    query_parser.set_defaults(func=cmd_query)
+
+    assign_parser = commands.add_parser("assign", help="Pick a different account for each party.")
+    assign_parser.add_argument("parties", nargs="+", help="Comma separated ranks of each party's other members, e.g. \"Gold 3,Platinum 1\".")
+    assign_parser.add_argument("--format", choices=QUERY_FORMATS, default="table", help="Output format.")
+    assign_parser.set_defaults(func=cmd_assign)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    finally:
+        # Close pooled connections so SQLite checkpoints and removes the WAL files
+        dbo = sys.modules.get("app.utils.dbo")
+        if dbo is not None:
+            dbo.engine.dispose()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
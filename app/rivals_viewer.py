@@ -1,26 +1,31 @@
+import asyncio
+import os
+import sys
+from textual import work
 from textual.app import App, ComposeResult
 from textual.widgets import Input, Button, Select, DataTable, Header, Footer, Static
 from textual.containers import Horizontal, Container
 from textual.coordinate import Coordinate
-from app.utils.dbo import User, engine, init_db
-from app.utils.rank_utils import get_valid_ranks
+from app.utils.dbo import User, engine, init_db, result_cache
+from app.utils.async_dbo import AsyncUser, async_engine, async_session, load_rank_index_async
+from app.utils.rank_utils import RANKS, RANK_MAP, get_valid_ranks, match_party, match_rank, party_mask, valid_rank_mask
 from app.utils.error_screen import ErrorScreen
 from app.utils.stretchy_datatable import StretchyDataTable
-from sqlmodel import Session
+from app.utils.stats_panel import StatsPanel
+from app.utils.result_pager import ResultPager
+from app.utils.user_row import UserRow
+from app.utils.party import find_party_accounts
 from app.utils.User_Error import UserError
-from app.utils.logger import logger
-
-# Rank Mapping from highest to lowest
-RANKS = [
-    "Celestial 1", "Celestial 2", "Celestial 3",
-    "Grand Master 1", "Grand Master 2", "Grand Master 3",
-    "Diamond 1", "Diamond 2", "Diamond 3",
-    "Platinum 1", "Platinum 2", "Platinum 3",
-    "Gold 1", "Gold 2", "Gold 3",
-    "Silver 1", "Silver 2", "Silver 3",
-    "Bronze 1", "Bronze 2", "Bronze 3"
-]
-RANK_MAP = {rank: i for i, rank in enumerate(reversed(RANKS))}
+from app.utils.logger import log_dir, logger
+from app.utils.metrics import metrics
+from app.utils.profiler import profiler
+from app.utils.config import METRICS_FILE
+from app.utils.startup_timer import startup_timer
+
+# Seconds to wait after the last keystroke before running an incremental search
+SEARCH_DEBOUNCE = 0.3
+
+EDIT_PROMPT = "Click on the row you would like to edit or delete. Press space to select several rows for a batch rank change or delete."
 
 # Database setup
 class RivalsSmurfTracker(App):
@@ -122,7 +127,16 @@ class RivalsSmurfTracker(App):
     }
 
     """
-    BINDINGS = [("ctrl+q", "quit", "CTRL+Q to Quit")]
+    BINDINGS = [("ctrl+q", "quit", "CTRL+Q to Quit"), ("ctrl+t", "toggle_stats", "CTRL+T Timings")]
+
+    def __init__(self, incremental_search: bool = True):
+        super().__init__()
+        self.incremental_search = incremental_search
+        self._search_timer = None
+        self._search_generation = 0
+        self._search_connection = None
+        self._pager = None
+        self._loading = False
 
     def compose(self) -> ComposeResult:
 
@@ -155,7 +169,7 @@ class RivalsSmurfTracker(App):
 
             yield Button("Submit", id="submit_btn", classes="submit ")
  
-            search_input = Input(placeholder="Search by username or rank", id="search", classes="search col-span-2")
+            search_input = Input(placeholder="Search by username, rank, or a party like Gold 3, Platinum 1", id="search", classes="search col-span-2")
             search_input.border_title = "Search"
             yield search_input
 
@@ -163,7 +177,7 @@ class RivalsSmurfTracker(App):
             
         # Search content
         with Container(id="datatable_container"):
-            yield Static("Click on the row you would like to edit or delete.", id="edit_user_prompt", classes="col-span-3")
+            yield Static(EDIT_PROMPT, id="edit_user_prompt", classes="col-span-3")
 
             yield StretchyDataTable(id="results", cursor_type="row", classes="datatable")
 
@@ -196,9 +210,14 @@ class RivalsSmurfTracker(App):
                 yield Button("Save Changes", id="save_edit", classes="edit buttons")
                 yield Button("Delete", id="delete", classes="edit buttons ml-2")
 
+        yield StatsPanel(id="stats")
+
         yield Footer()
 
     def on_mount(self) -> None:
+        self.call_after_refresh(startup_timer.mark, "first paint (since launch)")
+        self.call_after_refresh(profiler.finish, "startup")
+        self.run_worker(self.load_rank_index(), group="rank_index")
 
         user_rank_select = self.query_one("#rank", Select)
         user_rank_current = user_rank_select.query_one("SelectCurrent")
@@ -209,12 +228,13 @@ class RivalsSmurfTracker(App):
         edit_rank_current.border_title = "Edit Rank"
 
         table = self.query_one(DataTable)
-        table.add_column("Username", width=25)
-        table.add_column("Password", width=25)
-        table.add_column("UID", width=25)
-        table.add_column("Level", width=25)
-        table.add_column("Rank", width=25)
+        table.add_column("Username", width=25, key="username")
+        table.add_column("Password", width=25, key="password")
+        table.add_column("UID", width=25, key="uid")
+        table.add_column("Level", width=25, key="level")
+        table.add_column("Rank", width=25, key="rank")
 
+    @profiler.wrap()
     def on_button_pressed(self, event) -> None:
         if event.button.id == "submit_btn":
             self.store_entry()
@@ -225,6 +245,27 @@ class RivalsSmurfTracker(App):
         elif event.button.id == "delete":
             self.delete_entry()
 
+    @profiler.wrap()
+    def on_input_changed(self, event: Input.Changed) -> None:
+        if event.input.id != "search" or not self.incremental_search:
+            return
+        # The running search is already stale: drop its results and abort its statement now, not after the debounce
+        self._search_generation += 1
+        self._interrupt_search()
+        if self._search_timer is not None:
+            self._search_timer.stop()
+        self._search_timer = self.set_timer(SEARCH_DEBOUNCE, self.search_entries)
+
+    @profiler.wrap()
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        if event.input.id == "search":
+            self.search_entries()
+
+    def action_toggle_stats(self) -> None:
+        self.query_one(StatsPanel).toggle()
+
+    @metrics.track("ui.row_selected")
+    @profiler.wrap()
     def on_data_table_row_selected(self, event: StretchyDataTable.RowSelected) -> None:
         
         self.query_one("#edit_container").display = True
@@ -244,7 +285,19 @@ class RivalsSmurfTracker(App):
         rank = self.query_one("#edit_rank")
         rank.value = self.query_one(DataTable).get_cell_at(Coordinate(event.cursor_row, 4)) or Select.BLANK
         
-    def store_entry(self):
+    async def load_rank_index(self) -> None:
+        """Load the rank index for the async engine without holding up the first paint."""
+        with startup_timer.phase("rank index"):
+            async with async_session() as session:
+                await load_rank_index_async(session)
+
+    async def on_unmount(self) -> None:
+        await async_engine.dispose()
+
+    @work(group="write")
+    @metrics.track("ui.store_entry")
+    @profiler.wrap()
+    async def store_entry(self):
 
         username = self.query_one("#username", Input).value.strip()
         password = self.query_one("#password", Input).value.strip()
@@ -260,9 +313,9 @@ class RivalsSmurfTracker(App):
             self.push_screen(ErrorScreen("These fields are required: username, password and rank"))
             return
         
-        with Session(engine) as session:
+        async with async_session() as session:
             try:
-                new_user = User.create_user(session, username, password, rank, RANK_MAP[rank], uid=uid, level=level,)
+                new_user = await AsyncUser.create_user(session, username, password, rank, RANK_MAP[rank], uid=uid, level=level,)
             except UserError as e:
                 self.push_screen(ErrorScreen(str(e))) 
                 return
@@ -280,47 +333,190 @@ class RivalsSmurfTracker(App):
         uid_input.value = ""
         level_input.value = ""
 
-        self.search_entries()
-
-    def search_entries(self):
-        search_query = self.query_one("#search", Input).value.strip()
-        with Session(engine) as session:
-            try:
-                rank_match = None
-                for rank in RANK_MAP:
-                    if rank.lower() == search_query.lower():
-                        rank_match = rank
-                        break
-                if rank_match:
-                    rank_value = RANK_MAP[rank_match]
-                    valid_ranks = get_valid_ranks(rank_value, RANK_MAP, RANKS)
-                    results = User.get_users_by_ranks(session, valid_ranks)
-                else:
-                    results = User.get_users_by_username(session, search_query)
-            except Exception as e:
-                logger.error(f"Error searching for users: {e}")
-                self.push_screen(ErrorScreen("An error occurred while searching. Try again."))
+        if new_user is not None:
+            self.apply_user_change(new_user.id, new_user)
+
+    def search_entries(self) -> None:
+        """Start a background search for the current query, superseding any running one."""
+        if self._search_timer is not None:
+            self._search_timer.stop()
+            self._search_timer = None
+        self._interrupt_search()
+        self._search_generation += 1
+        self.run_search(self.query_one("#search", Input).value.strip(), self._search_generation)
+
+    @work(exclusive=True, group="search")
+    @metrics.track("ui.search")
+    @profiler.wrap()
+    async def run_search(self, search_query: str, generation: int) -> None:
+        pager = self.search_pager(search_query)
+        try:
+            async with async_session() as session:
+                connection = await (await session.connection()).get_raw_connection()
+                self._search_connection = connection.driver_connection
+                try:
+                    rows = await pager.next_page_async(session)
+                finally:
+                    if self._search_connection is connection.driver_connection:
+                        self._search_connection = None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if generation != self._search_generation:
                 return
+            logger.error(f"Error searching for users: {e}")
+            self.push_screen(ErrorScreen("An error occurred while searching. Try again."))
+            return
+
+        self.show_results(pager, rows, generation)
+
+    def search_pager(self, search_query: str) -> ResultPager:
+        """Build a pager for a party or rank search or, failing that, a username search."""
+        party = match_party(search_query)
+        if party:
+            member_ranks = [RANK_MAP[rank] for rank in party]
+            mask = party_mask(member_ranks)
+            return ResultPager(
+                lambda session, after_id, limit: find_party_accounts(session, member_ranks, after_id=after_id, limit=limit),
+                matches=lambda user: bool(mask >> user.rank_value & 1),
+            )
 
+        rank_match = match_rank(search_query)
+        if rank_match:
+            rank_value = RANK_MAP[rank_match]
+            valid_ranks = get_valid_ranks(rank_value)
+            mask = valid_rank_mask(rank_value)
+            return ResultPager(
+                lambda session, after_id, limit: User.get_rows_by_ranks(session, valid_ranks, after_id=after_id, limit=limit),
+                matches=lambda user: bool(mask >> user.rank_value & 1),
+            )
+
+        # LIKE wildcards in the query cannot be checked row by row, so those searches are re-run instead
+        matches = None
+        if "%" not in search_query and "_" not in search_query:
+            matches = lambda user: search_query.lower() in user.username.lower()
+        return ResultPager(
+            lambda session, after_id, limit: User.get_rows_by_username(session, search_query, after_id=after_id, limit=limit),
+            matches=matches,
+        )
+
+    def _interrupt_search(self) -> None:
+        """Abort the SQLite statement of the in-flight search, if any."""
+        if self._search_connection is not None:
+            # aiosqlite runs this straight away rather than queueing it behind the running statement
+            self.run_worker(self._search_connection.interrupt(), group="interrupt")
+            self._search_connection = None
+
+    def show_results(self, pager: ResultPager, rows: list[UserRow], generation: int) -> None:
+        """Show the first page of a search unless a newer search has started."""
+        if generation != self._search_generation:
+            return
+        self._pager = pager
         table = self.query_one(DataTable)
         table.clear()
-        for row in results:
+        self.add_result_rows(rows)
+
+    def on_stretchy_data_table_selection_changed(self, event: StretchyDataTable.SelectionChanged) -> None:
+        count = len(event.data_table.selected_keys)
+        prompt = self.query_one("#edit_user_prompt", Static)
+        if count:
+            prompt.update(f"{count} rows selected. Save Changes applies the Edit Rank to all of them; Delete removes all of them. Press escape to clear.")
+            self.query_one("#edit_container").display = True
+        else:
+            prompt.update(EDIT_PROMPT)
+
+    @profiler.wrap()
+    def on_stretchy_data_table_near_end(self, event: StretchyDataTable.NearEnd) -> None:
+        # NearEnd fires on every scroll tick; a page that is already loading is never cancelled,
+        # since cancelling an aiosqlite fetch breaks its pooled connection
+        pager = self._pager
+        if self._loading or pager is None or pager.exhausted:
+            return
+        self._loading = True
+        self.load_more_results(pager)
+
+    @work(group="load_more")
+    @metrics.track("ui.load_more")
+    @profiler.wrap()
+    async def load_more_results(self, pager: ResultPager) -> None:
+        """Append the next page of pager to the table, if it is still the current search."""
+        try:
+            async with async_session() as session:
+                rows = await pager.next_page_async(session)
+        except Exception as e:
+            logger.error(f"Error loading more search results: {e}")
+            return
+        finally:
+            self._loading = False
+        if pager is self._pager:
+            self.add_result_rows(rows)
+
+    def apply_user_change(self, user_id: int, user: User | None = None) -> bool:
+        """Apply one created, updated or deleted (user is None) row to the results table.
+
+        Falls back to re-running the search when the change cannot be placed
+        without it, e.g. a row that starts matching in the middle of the loaded pages.
+        Returns True if the search was re-run, which already reflects any further changes.
+        """
+        pager = self._pager
+        if pager is None or pager.matches is None:
+            self.search_entries()
+            return True
+
+        table = self.query_one(DataTable)
+        row_key = str(user_id)
+        shown = row_key in table.rows
+
+        if user is None or not pager.matches(user):
+            if shown:
+                table.remove_row(row_key)
+            return False
+
+        if shown:
+            table.update_cell(row_key, "username", user.username)
+            table.update_cell(row_key, "password", user.password)
+            table.update_cell(row_key, "uid", user.uid)
+            table.update_cell(row_key, "level", user.level)
+            table.update_cell(row_key, "rank", user.rank)
+        elif pager.exhausted and (pager.last_id is None or user_id > pager.last_id):
+            self.add_result_rows([user])
+            pager.last_id = user_id
+        elif pager.is_loaded(user_id):
+            self.search_entries()
+            return True
+        return False
+
+    def add_result_rows(self, rows: list[UserRow]) -> None:
+        table = self.query_one(DataTable)
+        for row in rows:
             table.add_row(
                 row.username,
                 row.password,
                 row.uid,
                 row.level,
-                row.rank
+                row.rank,
+                key=str(row.id)
             )
 
-    def save_edit(self):
-        selected_row = self.query_one(DataTable).cursor_row
-        if selected_row is None:
+    def selected_user_id(self) -> int | None:
+        """Return the User.id behind the highlighted row, taken from its row key."""
+        table = self.query_one(DataTable)
+        if table.row_count == 0 or table.cursor_row is None:
+            return None
+        return int(table.coordinate_to_cell_key(Coordinate(table.cursor_row, 0)).row_key.value)
+
+    @work(group="write")
+    @metrics.track("ui.save_edit")
+    @profiler.wrap()
+    async def save_edit(self):
+        if self.query_one(StretchyDataTable).selected_keys:
+            await self.save_batch_edit()
+            return
+
+        user_id = self.selected_user_id()
+        if user_id is None:
             self.push_screen(ErrorScreen("No user selected. Please choose a row before editing."))
             return
-        else: 
-           o_username = self.query_one(DataTable).get_cell_at(Coordinate(selected_row, 0))
-           o_uid = self.query_one(DataTable).get_cell_at(Coordinate(selected_row, 2))
 
         username = self.query_one("#edit_username", Input).value.strip()
         password = self.query_one("#edit_password", Input).value.strip()
@@ -338,61 +534,117 @@ class RivalsSmurfTracker(App):
 
         rank_value = RANK_MAP[rank]
         
-        with Session(engine) as session:
+        async with async_session() as session:
             try:
-                user = User.get_user_by_username(session, o_username, o_uid)
-                if user:
-                    user.update_user(session, username, password, rank, rank_value, uid=uid, level=level)
-                    print(f"Updated User: {user.username}")
-                else:
-                    self.push_screen(ErrorScreen(f"Failed to find user: {o_username}. Please try again."))
+                user = await AsyncUser.update_user_by_id(session, user_id, username, password, rank, rank_value, uid=uid, level=level)
+            except UserError as e:
+                self.push_screen(ErrorScreen(str(e)))
+                return
             except Exception as e:
-                logger.error(f"Error updating user '{o_username}': {e}")
+                logger.error(f"Error updating user {user_id}: {e}")
                 self.push_screen(ErrorScreen("Failed to update user. Please try again."))
                 return
 
-        self.search_entries()
-        
+        if user is None:
+            self.push_screen(ErrorScreen(f"Failed to find user: {username}. Please try again."))
+            self.apply_user_change(user_id)
+            return
+        self.apply_user_change(user_id, user)
+        self.hide_edit()
+
+    async def save_batch_edit(self) -> None:
+        """Apply the Edit Rank to every selected row in one statement."""
+        table = self.query_one(StretchyDataTable)
+        rank = self.query_one("#edit_rank", Select).value
+        if rank is Select.BLANK:
+            self.push_screen(ErrorScreen("Choose a rank to apply to the selected users."))
+            return
+
+        user_ids = sorted(int(key) for key in table.selected_keys)
+        async with async_session() as session:
+            try:
+                users = await AsyncUser.update_users_rank(session, user_ids, rank, RANK_MAP[rank])
+            except Exception as e:
+                logger.error(f"Error updating {len(user_ids)} users: {e}")
+                self.push_screen(ErrorScreen("Failed to update the selected users. Please try again."))
+                return
+
+        table.action_clear_selection()
+        for user in users:
+            if self.apply_user_change(user.id, user):
+                break
+        self.hide_edit()
+
+    async def delete_batch(self) -> None:
+        """Delete every selected row in one statement."""
+        table = self.query_one(StretchyDataTable)
+        user_ids = sorted(int(key) for key in table.selected_keys)
+        async with async_session() as session:
+            try:
+                if not await AsyncUser.delete_users_by_id(session, user_ids):
+                    self.push_screen(ErrorScreen("Failed to delete the selected users."))
+                    return
+            except Exception as e:
+                logger.error(f"Error deleting {len(user_ids)} users: {e}")
+                self.push_screen(ErrorScreen("An error occurred while deleting. Try again."))
+                return
+
+        table.action_clear_selection()
+        for user_id in user_ids:
+            if self.apply_user_change(user_id):
+                break
         self.hide_edit()
 
-    def delete_entry(self):
-        selected_row = self.query_one(DataTable).cursor_row
-        if selected_row is None:
+    @work(group="write")
+    @metrics.track("ui.delete_entry")
+    @profiler.wrap()
+    async def delete_entry(self):
+        if self.query_one(StretchyDataTable).selected_keys:
+            await self.delete_batch()
+            return
+
+        user_id = self.selected_user_id()
+        if user_id is None:
             self.push_screen(ErrorScreen("No user selected. Please choose a row before editing."))
             return
-        else:
-            username = self.query_one(DataTable).get_cell_at(Coordinate(selected_row, 0))
-            password = self.query_one(DataTable).get_cell_at(Coordinate(selected_row, 1))
-            uid = self.query_one(DataTable).get_cell_at(Coordinate(selected_row, 2))
-            if uid == "":
-                uid = None
-            level = self.query_one(DataTable).get_cell_at(Coordinate(selected_row, 3))
-            if level == "":
-                level = None
-            rank = self.query_one(DataTable).get_cell_at(Coordinate(selected_row, 4))
-            rank_value = RANK_MAP[rank]
-
-            with Session(engine) as session:
-                try:
-                    if not User.delete_user(session, username, password, rank, rank_value, uid=uid, level=level):
-                        self.push_screen(ErrorScreen(f"Failed to delete user: {username}"))
-                        return
-                except Exception as e:
-                    logger.error(f"Error deleting user {username}: {e}")
-                    self.push_screen(ErrorScreen("An error occurred while deleting. Try again."))
+
+        async with async_session() as session:
+            try:
+                if not await AsyncUser.delete_user_by_id(session, user_id):
+                    username = self.query_one(DataTable).get_cell(str(user_id), "username")
+                    self.push_screen(ErrorScreen(f"Failed to delete user: {username}"))
                     return
+            except Exception as e:
+                logger.error(f"Error deleting user {user_id}: {e}")
+                self.push_screen(ErrorScreen("An error occurred while deleting. Try again."))
+                return
 
-        self.search_entries()
+        self.apply_user_change(user_id)
         self.hide_edit()
 
     def hide_edit(self):
         self.query_one("#edit_container").display = False
 
 def main_run() -> None:
+    # Covers database setup, compose and mount up to the first paint
+    profiler.start("startup")
     try:
-        init_db()
+        with startup_timer.phase("init db"):
+            init_db()
     except Exception as e:
         logger.error(f"Failed to initialize the database: {e}")
         exit(1)
-        
+
     RivalsSmurfTracker().run()
+    profiler.finish("startup")
+    engine.dispose()
+
+    logger.info("Result cache: %s", result_cache.stats())
+    try:
+        metrics.dump(os.path.join(log_dir, METRICS_FILE))
+    except OSError as e:
+        logger.error(f"Failed to write operation timings: {e}")
+
+    if startup_timer.enabled:
+        logger.info(startup_timer.report())
+        print(startup_timer.report(), file=sys.stderr)
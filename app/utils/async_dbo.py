@@ -0,0 +1,60 @@
+"""Awaitable User data access on SQLAlchemy's async engine with aiosqlite.
+
+AsyncUser mirrors the User classmethods. Each call runs the same sync method
+through AsyncSession.run_sync, so validation, logging and rank index upkeep
+are shared with the sync API while every statement is awaited on the aiosqlite
+driver instead of blocking the event loop.
+"""
+from functools import wraps
+from typing import Any, Callable
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.utils.config import DB_PATH, SQLITE_MAX_OVERFLOW, SQLITE_POOL_SIZE, SQLITE_PROFILE, SQLITE_PROFILES
+from app.utils.dbo import User, apply_sqlite_profile, load_rank_index
+
+
+def create_async_db_engine(path: str = DB_PATH, profile: str = SQLITE_PROFILE) -> AsyncEngine:
+    """Create an aiosqlite engine for the database file with a SQLite storage profile applied."""
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLite profile: {profile}")
+    db_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", pool_size=SQLITE_POOL_SIZE, max_overflow=SQLITE_MAX_OVERFLOW)
+    apply_sqlite_profile(db_engine.sync_engine, profile)
+    return db_engine
+
+async_engine = create_async_db_engine()
+
+
+def async_session(db_engine: AsyncEngine | None = None) -> AsyncSession:
+    """Open an AsyncSession whose returned users stay readable after commit.
+
+    Attribute loads on expired instances would need I/O outside run_sync, so
+    commits do not expire them; use one session per operation.
+    """
+    return AsyncSession(db_engine or async_engine, expire_on_commit=False)
+
+
+def _awaitable(method: Callable) -> staticmethod:
+    @wraps(method)
+    async def run(session: AsyncSession, *args: Any, **kwargs: Any) -> Any:
+        return await session.run_sync(method, *args, **kwargs)
+    return staticmethod(run)
+
+
+class AsyncUser:
+    """Async counterparts of the User data-access methods; pass an AsyncSession first."""
+
+    create_user = _awaitable(User.create_user)
+    get_user_by_username = _awaitable(User.get_user_by_username)
+    get_users_by_username = _awaitable(User.get_users_by_username)
+    get_users_by_ranks = _awaitable(User.get_users_by_ranks)
+    get_rows_by_username = _awaitable(User.get_rows_by_username)
+    get_rows_by_ranks = _awaitable(User.get_rows_by_ranks)
+    update_user_by_id = _awaitable(User.update_user_by_id)
+    update_users_rank = _awaitable(User.update_users_rank)
+    delete_user_by_id = _awaitable(User.delete_user_by_id)
+    delete_users_by_id = _awaitable(User.delete_users_by_id)
+
+
+async def load_rank_index_async(session: AsyncSession) -> None:
+    """Load the rank index for the async engine, so AsyncUser rank searches use it."""
+    await session.run_sync(load_rank_index)
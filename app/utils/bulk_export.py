@@ -0,0 +1,87 @@
+import csv
+import json
+import sys
+from typing import Iterator, TextIO
+from sqlmodel import Session, select
+from app.utils.dbo import User
+from app.utils.User_Error import UserError
+from app.utils.config import EXPORT_BATCH_SIZE, EXPORT_FORMATS
+from app.utils.rank_utils import RANK_MAP, get_valid_ranks, match_rank
+
+EXPORT_COLUMNS = ("id", "username", "password", "uid", "level", "rank", "rank_value")
+
+
+def export_statement(session: Session, rank: str | None = None, search_query: str | None = None):
+    """Select the exported columns, optionally filtered like the TUI rank and username searches."""
+    statement = select(*(getattr(User, column) for column in EXPORT_COLUMNS))
+    if rank:
+        rank_match = match_rank(rank)
+        if rank_match is None:
+            raise UserError(f"Unknown rank: {rank}")
+        statement = statement.where(User.rank_values_filter(get_valid_ranks(RANK_MAP[rank_match])))
+    if search_query:
+        statement = statement.where(User.username_filter(session, search_query))
+    return statement.order_by(User.id)
+
+
+def iter_batches(session: Session, statement, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[list[tuple]]:
+    """Stream the statement's rows in batches without loading the whole result."""
+    result = session.exec(statement.execution_options(yield_per=batch_size))
+    for partition in result.partitions(batch_size):
+        yield [tuple(row) for row in partition]
+
+
+def _write_csv(stream: TextIO, batches: Iterator[list[tuple]]) -> int:
+    writer = csv.writer(stream)
+    writer.writerow(EXPORT_COLUMNS)
+    count = 0
+    for batch in batches:
+        writer.writerows(batch)
+        count += len(batch)
+    return count
+
+
+def _write_jsonl(stream: TextIO, batches: Iterator[list[tuple]]) -> int:
+    count = 0
+    for batch in batches:
+        stream.writelines(json.dumps(dict(zip(EXPORT_COLUMNS, row))) + "\n" for row in batch)
+        count += len(batch)
+    return count
+
+
+def _write_parquet(path: str, batches: Iterator[list[tuple]]) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise UserError("Parquet export needs the optional pyarrow package.") from e
+
+    schema = pa.schema([
+        ("id", pa.int64()), ("username", pa.string()), ("password", pa.string()), ("uid", pa.string()),
+        ("level", pa.int64()), ("rank", pa.string()), ("rank_value", pa.int64()),
+    ])
+    count = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for batch in batches:
+            columns = list(zip(*batch))
+            writer.write_table(pa.Table.from_arrays([pa.array(column, type=f.type) for column, f in zip(columns, schema)], schema=schema))
+            count += len(batch)
+    return count
+
+
+def export_users(session: Session, path: str, fmt: str, rank: str | None = None, search_query: str | None = None) -> int:
+    """Stream usersv2 rows to path ("-" for stdout) and return how many were written."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    batches = iter_batches(session, export_statement(session, rank, search_query))
+
+    if fmt == "parquet":
+        if path == "-":
+            raise UserError("Parquet export needs a file path.")
+        return _write_parquet(path, batches)
+
+    write = _write_csv if fmt == "csv" else _write_jsonl
+    if path == "-":
+        return write(sys.stdout, batches)
+    with open(path, "w", newline="", encoding="utf-8") as stream:
+        return write(stream, batches)
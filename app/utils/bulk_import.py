@@ -0,0 +1,158 @@
+import csv
+import json
+import time
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Iterable, Iterator
+from sqlalchemy import insert
+from sqlmodel import Session, select, or_
+from app.utils.dbo import RESULT_COLUMNS, User, rank_index, result_cache
+from app.utils.logger import logger
+from app.utils.config import IMPORT_BATCH_SIZE
+from app.utils.rank_utils import RANK_MAP
+from app.utils.user_row import UserRow
+
+
+@dataclass
+class ImportConflict:
+    line: int
+    username: str | None
+    reason: str
+
+
+@dataclass
+class ImportReport:
+    imported: int = 0
+    conflicts: list[ImportConflict] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.imported / self.elapsed if self.elapsed else 0.0
+
+
+def read_csv(path: str) -> Iterator[dict]:
+    """Stream rows from a CSV file with a username,password,rank[,uid,level] header."""
+    with open(path, newline="", encoding="utf-8") as f:
+        yield from csv.DictReader(f)
+
+
+def read_jsonl(path: str) -> Iterator[str]:
+    """Stream the non-empty lines of a file with one JSON object per line.
+
+    Lines are decoded by import_users, so a malformed line is reported as a
+    conflict instead of aborting the import.
+    """
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield line
+
+
+def read_rows(path: str, fmt: str) -> Iterator[dict | str]:
+    if fmt == "csv":
+        return read_csv(path)
+    if fmt == "jsonl":
+        return read_jsonl(path)
+    raise ValueError(f"Unsupported import format: {fmt}")
+
+
+def _parse_row(row: dict | str) -> dict:
+    """Decode a raw JSONL line into a row dict; CSV rows are already dicts."""
+    if isinstance(row, str):
+        row = json.loads(row)
+    if not isinstance(row, dict):
+        raise TypeError("row is not a JSON object")
+    return row
+
+
+def _clean_row(row: dict) -> dict:
+    """Normalise one input row into usersv2 column values, raising ValueError if invalid."""
+    username = (row.get("username") or "").strip()
+    password = (row.get("password") or "").strip()
+    rank = (row.get("rank") or "").strip()
+    if not username or not password or not rank:
+        raise ValueError("username, password and rank are required")
+    if rank not in RANK_MAP:
+        raise ValueError(f"unknown rank '{rank}'")
+
+    uid = row.get("uid")
+    uid = str(uid).strip() if uid not in (None, "") else None
+    level = row.get("level")
+    level = int(level) if level not in (None, "") else None
+
+    return {"username": username, "password": password, "uid": uid, "level": level, "rank": rank, "rank_value": RANK_MAP[rank]}
+
+
+def _import_batch(session: Session, batch: list[tuple[int, dict | str]], report: ImportReport) -> None:
+    """Insert one batch in a single transaction after a set-based conflict check."""
+    rows: list[tuple[int, dict]] = []
+    for line, raw in batch:
+        row = {}
+        try:
+            row = _parse_row(raw)
+            rows.append((line, _clean_row(row)))
+        # JSONDecodeError is a ValueError; AttributeError covers non-string field values
+        except (ValueError, TypeError, AttributeError) as e:
+            report.conflicts.append(ImportConflict(line, row.get("username"), str(e)))
+
+    usernames = {row["username"].lower() for _, row in rows}
+    uids = {row["uid"] for _, row in rows if row["uid"]}
+    statement = select(User.username, User.uid).where(
+        or_(User.username.collate("NOCASE").in_(usernames), User.uid.in_(uids))
+    )
+    taken_usernames: set[str] = set()
+    taken_uids: set[str] = set()
+    for username, uid in session.exec(statement):
+        taken_usernames.add(username.lower())
+        if uid:
+            taken_uids.add(uid)
+
+    accepted: list[tuple[int, dict]] = []
+    for line, row in rows:
+        if row["username"].lower() in taken_usernames:
+            report.conflicts.append(ImportConflict(line, row["username"], "username already exists"))
+        elif row["uid"] and row["uid"] in taken_uids:
+            report.conflicts.append(ImportConflict(line, row["username"], "uid already exists"))
+        else:
+            taken_usernames.add(row["username"].lower())
+            if row["uid"]:
+                taken_uids.add(row["uid"])
+            accepted.append((line, row))
+
+    values = [row for _, row in accepted]
+    if not values:
+        return
+    try:
+        session.exec(insert(User), params=values)
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        logger.error(f"Error inserting batch starting at row {batch[0][0]} in import_users: {e}")
+        for line, row in accepted:
+            report.conflicts.append(ImportConflict(line, row["username"], "batch failed to insert"))
+        return
+    report.imported += len(values)
+
+    if rank_index.is_tracking(session.get_bind()):
+        columns = (getattr(User, column) for column in RESULT_COLUMNS)
+        inserted = session.exec(select(*columns).where(User.username.in_([row["username"] for row in values])))
+        for user in UserRow.from_rows(inserted):
+            rank_index.add(user)
+    result_cache.invalidate()
+
+
+def import_users(session: Session, rows: Iterable[dict | str], batch_size: int = IMPORT_BATCH_SIZE) -> ImportReport:
+    """Import accounts in batches of batch_size rows, one transaction per batch.
+
+    Rows are dicts or raw JSONL lines. Rows that are malformed, invalid or
+    clash with an existing (or earlier imported) username/uid are skipped and listed in the report's conflicts.
+    """
+    report = ImportReport()
+    start = time.perf_counter()
+    numbered = enumerate(rows, start=1)
+    while batch := list(islice(numbered, batch_size)):
+        _import_batch(session, batch, report)
+    report.elapsed = time.perf_counter() - start
+    logger.info(f"Imported {report.imported} users with {len(report.conflicts)} conflicts in {report.elapsed:.2f}s.")
+    return report
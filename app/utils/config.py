@@ -0,0 +1,64 @@
+import os
+
+# Location of the sqlite database, relative to the working directory
+DB_PATH = "users.db"
+
+# FTS5 trigram table that indexes usersv2.username
+USERNAME_SEARCH_TABLE = "usersv2_search"
+
+# Trigram matching needs at least this many characters to use the index
+MIN_TRIGRAM_QUERY = 3
+
+# Rows inserted per transaction by the bulk importer
+IMPORT_BATCH_SIZE = 1000
+IMPORT_FORMATS = ("csv", "jsonl")
+
+# Rows fetched from the cursor (and written as one parquet row group) at a time by the exporter
+EXPORT_BATCH_SIZE = 1000
+EXPORT_FORMATS = ("csv", "jsonl", "parquet")
+
+# SQLite storage profiles, applied as PRAGMAs on every new pooled connection.
+# Pick one with RIVALS_SQLITE_PROFILE (default "tuned").
+SQLITE_PROFILES: dict[str, dict[str, str | int]] = {
+    "default": {},
+    "tuned": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64 * 1024,  # negative means KiB, so 64 MiB
+        "temp_store": "MEMORY",
+    },
+}
+SQLITE_PROFILE = os.environ.get("RIVALS_SQLITE_PROFILE", "tuned")
+
+# Connections kept open by the engine pool: the UI thread, the search worker
+# and page loads each hold at most one at a time.
+SQLITE_POOL_SIZE = 4
+SQLITE_MAX_OVERFLOW = 4
+
+# Logging: level name from RIVALS_LOG_LEVEL, and logs/app.log is rotated once it
+# reaches LOG_MAX_BYTES, keeping LOG_BACKUP_COUNT old files (gzipped if RIVALS_LOG_COMPRESS=1).
+LOG_LEVEL = os.environ.get("RIVALS_LOG_LEVEL", "INFO").upper()
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+LOG_COMPRESS = os.environ.get("RIVALS_LOG_COMPRESS") == "1"
+
+# Operation timings: latencies of the last METRICS_WINDOW calls per operation are
+# kept for percentiles, and every call is counted in a histogram with these upper bounds.
+# The totals are written to logs/METRICS_FILE when the app exits.
+METRICS_WINDOW = 1024
+METRICS_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+METRICS_FILE = "metrics.json"
+
+# Set RIVALS_PROFILE=1 to write a cProfile .prof file per handler call to logs/profiles.
+# Only every RIVALS_PROFILE_SAMPLE-th call of a handler is profiled, calls faster than
+# RIVALS_PROFILE_MIN_MS are dropped, and at most RIVALS_PROFILE_MAX files are written per run.
+PROFILE_ENABLED = os.environ.get("RIVALS_PROFILE") == "1"
+PROFILE_SAMPLE_EVERY = int(os.environ.get("RIVALS_PROFILE_SAMPLE", "1"))
+PROFILE_MIN_MS = float(os.environ.get("RIVALS_PROFILE_MIN_MS", "10"))
+PROFILE_MAX_FILES = int(os.environ.get("RIVALS_PROFILE_MAX", "50"))
+
+# Search results cached by User.get_rows_by_*, evicted least recently used beyond
+# either bound. Set RIVALS_RESULT_CACHE=0 to always query.
+RESULT_CACHE_ENTRIES = 256
+RESULT_CACHE_BYTES = 32 * 1024 * 1024
@@ -1,11 +1,51 @@
-from sqlmodel import SQLModel, Field, Session, create_engine, select, and_, or_ , func
-from typing import Optional
+from sqlmodel import SQLModel, Field, Session, create_engine, delete, select, update, and_, or_
+from sqlalchemy import Column, Index, Integer, MetaData, String, Table, event, text, union_all
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
+from contextlib import contextmanager
+from typing import Iterator, Optional
+from weakref import WeakKeyDictionary
 from app.utils.logger import logger
+from app.utils.metrics import metrics
 from app.utils.User_Error import UserError
+from app.utils.config import DB_PATH, MIN_TRIGRAM_QUERY, RESULT_CACHE_BYTES, RESULT_CACHE_ENTRIES, SQLITE_MAX_OVERFLOW, SQLITE_POOL_SIZE, SQLITE_PROFILE, SQLITE_PROFILES, USERNAME_SEARCH_TABLE
+from app.utils.migrations import SCHEMA_VERSION, _table_exists, copy_legacy_users, create_username_search, get_version, migrate
+from app.utils.rank_index import RankIndex
+from app.utils.result_cache import ResultCache
+from app.utils.rank_utils import as_window
+from app.utils.user_row import UserRow
+from app.utils.startup_timer import startup_timer
+import os
 import sqlite3
 
+# In-memory rank buckets used by get_rows_by_ranks. Set RIVALS_RANK_INDEX=0 to
+# always query the database instead.
+rank_index = RankIndex(enabled=os.environ.get("RIVALS_RANK_INDEX", "1") != "0")
+
+# Results of get_rows_by_ranks and get_rows_by_username, dropped by every write.
+# Writers update rank_index first and invalidate after, so a search that sees the
+# new generation also sees the new index and cannot cache stale rows under it.
+result_cache = ResultCache(
+    RESULT_CACHE_ENTRIES, RESULT_CACHE_BYTES, enabled=os.environ.get("RIVALS_RESULT_CACHE", "1") != "0"
+)
+
+# FTS5 trigram index over usersv2.username, kept in sync by triggers. It lives in
+# its own MetaData so create_all does not try to create it as a regular table.
+username_search = Table(USERNAME_SEARCH_TABLE, MetaData(), Column("rowid", Integer), Column("username", String))
+
+# Engines on which the username search table is known to exist (or not).
+_username_search_engines: WeakKeyDictionary = WeakKeyDictionary()
+
+# Columns returned by the projection searches (get_rows_by_*), in UserRow field order
+RESULT_COLUMNS = ("id", "username", "password", "uid", "level", "rank", "rank_value")
+
 class User(SQLModel, table=True):
     __tablename__ = "usersv2"
+    # Case-insensitive username uniqueness, also used for indexed conflict lookups
+    __table_args__ = (
+        Index("ix_usersv2_username_nocase", text("username COLLATE NOCASE"), unique=True),
+        Index("ix_usersv2_rank_value_username", "rank_value", "username"),
+    )
     id: int | None = Field(default=None, primary_key=True)
     username: str = Field(index=True, unique=True)
     password: str
@@ -15,6 +55,23 @@ class User(SQLModel, table=True):
     rank_value: int
     
     @classmethod
+    def _page(cls, statement, after_id: int | None, limit: int | None):
+        """Order a select by id and restrict it to the keyset page that starts after after_id."""
+        if after_id is not None:
+            statement = statement.where(cls.id > after_id)
+        return statement.order_by(cls.id).limit(limit)
+
+    @classmethod
+    def username_filter(cls, session: Session, search_query: str, use_search_index: bool = True):
+        """Build the where clause for a case-insensitive username substring search."""
+        pattern = f"%{search_query}%"
+        if use_search_index and len(search_query) >= MIN_TRIGRAM_QUERY and has_username_search(session):
+            matches = select(username_search.c.rowid).where(username_search.c.username.like(pattern))
+            return cls.id.in_(matches)
+        return cls.username.ilike(pattern)
+
+    @classmethod
+    @metrics.track("db.does_user_exists")
     def does_user_exists(cls, session: Session, username: str = None, uid: str = None) -> bool:
         """Check if a user with the given username or uid exists."""
         if not username and not uid:
@@ -23,7 +80,7 @@ class User(SQLModel, table=True):
         try:
             statement = select(cls).where(
                 or_(
-                    func.lower(cls.username) == func.lower(username) if username else False,
+                    cls.username.collate("NOCASE") == username if username else False,
                     cls.uid == uid if uid else False
                 )
             )
@@ -33,28 +90,84 @@ class User(SQLModel, table=True):
             return False
 
     @classmethod
+    def find_conflict(cls, session: Session, username: str, uid: str | None = None, exclude_id: int | None = None) -> str | None:
+        """Return "username" or "uid" if another user already holds either value.
+
+        Both unique constraints are resolved by one query over the NOCASE username
+        index and the uid index. When updating row exclude_id, a username that
+        row already holds (ignoring case) is never a conflict, so accounts kept
+        as case-only duplicates by migration 3 can still be saved.
+        """
+        username_taken = cls.username.collate("NOCASE") == username
+        if exclude_id is not None:
+            own = aliased(cls)
+            unchanged = select(own.id).where(own.id == exclude_id, own.username.collate("NOCASE") == username).exists()
+            username_taken = and_(username_taken, ~unchanged)
+        conditions = [username_taken]
+        if uid:
+            conditions.append(cls.uid == uid)
+        statement = select(username_taken.label("username_taken"), cls.uid).where(or_(*conditions))
+        if exclude_id is not None:
+            statement = statement.where(cls.id != exclude_id)
+
+        conflict = None
+        for row_username_taken, row_uid in session.exec(statement.limit(2)):
+            if row_username_taken:
+                return "username"
+            if uid and row_uid == uid:
+                conflict = "uid"
+        return conflict
+
+    @staticmethod
+    @contextmanager
+    def _unique_errors(uid_message: str) -> Iterator[None]:
+        """Report a UNIQUE violation raised in the block as the same UserError as find_conflict.
+
+        The violation means another writer won the race between the lookup and the write.
+        """
+        try:
+            yield
+        except IntegrityError as e:
+            message = str(e.orig)
+            if "UNIQUE" not in message:
+                raise
+            if "usersv2.uid" in message:
+                raise UserError(uid_message) from e
+            raise UserError("A user with this username already exists.") from e
+
+    @staticmethod
+    def _commit_unique(session: Session, uid_message: str) -> None:
+        """Commit, reporting a UNIQUE violation as the same UserError as find_conflict."""
+        with User._unique_errors(uid_message):
+            session.commit()
+
+    @classmethod
+    @metrics.track("db.create_user")
     def create_user(cls, session: Session, username: str, password: str, rank: str, rank_value: int, uid: str | None = None, level: int | None = None,) -> Optional["User"]:
         """Create and save a new user."""
         try:
             if uid:
                 uid = uid.strip()
                 
-            if cls.does_user_exists(session, username=username):
-                logger.warning(f"Attempted to create user in create_user, but username '{username}' already exists.") 
+            conflict = cls.find_conflict(session, username, uid)
+            if conflict == "username":
+                logger.warning("Attempted to create user in create_user, but username '%s' already exists.", username)
                 raise UserError("A user with this username already exists.")
-
-            if uid and cls.does_user_exists(session, uid=uid):
-                logger.warning(f"Attempted to create user in create_user, but UID '{uid}' already exists.")
+            if conflict == "uid":
+                logger.warning("Attempted to create user in create_user, but UID '%s' already exists.", uid)
                 raise UserError("A user with this uid already exists.")
 
             user = cls(username=username, password=password, uid=uid, level=level, rank=rank, rank_value=rank_value)
             session.add(user)
-            session.commit()
+            cls._commit_unique(session, "A user with this uid already exists.")
             session.refresh(user)
+            if rank_index.is_tracking(session.get_bind()):
+                rank_index.add(UserRow.from_user(user))
+            result_cache.invalidate()
             return user
         except (UserError) as u_e:
             session.rollback()
-            logger.warning(f"UserError in create_user: {u_e}")
+            logger.warning("UserError in create_user: %s", u_e)
             raise u_e
         except (Exception) as e:
             session.rollback()
@@ -62,6 +175,7 @@ class User(SQLModel, table=True):
             return None
 
     @classmethod
+    @metrics.track("db.get_user_by_username")
     def get_user_by_username(cls, session: Session, username: str, uid:str | None = None) -> Optional["User"]:
         """Retrieve a user by username and uid."""
         try: 
@@ -72,54 +186,154 @@ class User(SQLModel, table=True):
            return None
     
     @classmethod
-    def get_users_by_username(cls, session: Session, search_query: str)  -> list["User"]:
-        """Search for users by username (case-insensitive)."""
+    @metrics.track("db.get_users_by_username")
+    def get_users_by_username(cls, session: Session, search_query: str, use_search_index: bool = True, after_id: int | None = None, limit: int | None = None)  -> list["User"]:
+        """Search for users by username (case-insensitive).
+
+        Queries of at least MIN_TRIGRAM_QUERY characters go through the FTS5 trigram
+        index when it is available, otherwise the usersv2 table is scanned with ILIKE.
+        Pass after_id and limit to fetch one keyset page ordered by id.
+        """
         try:
-            statement = select(cls).where(cls.username.ilike(f"%{search_query}%"))
-            return session.exec(statement).all()
+            statement = select(cls).where(cls.username_filter(session, search_query, use_search_index))
+            return session.exec(cls._page(statement, after_id, limit)).all()
         except Exception as e:
             logger.error(f"Error in get_users_by_username: {e}")
             return []
     
     @classmethod
-    def get_users_by_ranks(cls, session: Session, search_query: list[int]) -> list["User"]:
-        """Search for users by rank value."""
+    @metrics.track("db.get_rows_by_username")
+    def get_rows_by_username(cls, session: Session, search_query: str, use_search_index: bool = True, after_id: int | None = None, limit: int | None = None) -> list[UserRow]:
+        """Like get_users_by_username, but return read-only UserRow results instead of User instances.
+
+        Results are served from the result cache until the next write. Errors
+        are logged and raised, so a ResultPager never takes a failed page for
+        the end of the results.
+        """
         try:
-            statement = select(cls).where(cls.rank_value.in_(search_query))
-            return  session.exec(statement).all()
+            key = ("username", session.get_bind(), search_query.lower(), use_search_index, after_id, limit)
+            rows = result_cache.get(key)
+            if rows is not None:
+                return rows
+            generation = result_cache.generation
+            statement = select(*(getattr(cls, column) for column in RESULT_COLUMNS))
+            statement = statement.where(cls.username_filter(session, search_query, use_search_index))
+            rows = UserRow.from_rows(session.exec(cls._page(statement, after_id, limit)))
+            logger.debug("get_rows_by_username %r after id %s: %d rows", search_query, after_id, len(rows))
+            result_cache.put(key, rows, generation)
+            return rows
+        except Exception as e:
+            logger.error(f"Error in get_rows_by_username: {e}")
+            raise
+
+    @classmethod
+    def rank_values_filter(cls, rank_values: tuple[int, ...] | list[int]):
+        """WHERE clause matching rank_values, as a BETWEEN range when they are contiguous."""
+        window = as_window(rank_values)
+        if window is not None:
+            return cls.rank_value.between(*window)
+        return cls.rank_value.in_(rank_values)
+
+    @classmethod
+    @metrics.track("db.get_users_by_ranks")
+    def get_users_by_ranks(cls, session: Session, search_query: list[int], after_id: int | None = None, limit: int | None = None) -> list["User"]:
+        """Search for users by rank value.
+
+        Pass after_id and limit to fetch one keyset page ordered by id. Always
+        queries the database; get_rows_by_ranks answers from the rank index.
+        """
+        try:
+            statement = select(cls).where(cls.rank_values_filter(search_query))
+            return  session.exec(cls._page(statement, after_id, limit)).all()
         except Exception as e:
             logger.error(f"Error in get_users_by_ranks: {e}")
             return []
 
+    @classmethod
+    @metrics.track("db.get_rows_by_ranks")
+    def get_rows_by_ranks(cls, session: Session, search_query: list[int], after_id: int | None = None, limit: int | None = None) -> list[UserRow]:
+        """Like get_users_by_ranks, but return read-only UserRow results instead of User instances.
+
+        While the rank index is loaded the results come from it, and they are
+        served from the result cache until the next write. Errors are logged
+        and raised, like get_rows_by_username.
+        """
+        try:
+            bind = session.get_bind()
+            key = ("ranks", bind, tuple(sorted(set(search_query))), after_id, limit)
+            rows = result_cache.get(key)
+            if rows is not None:
+                return rows
+            generation = result_cache.generation
+            if rank_index.is_active(bind):
+                rows = rank_index.get(search_query, after_id=after_id, limit=limit)
+            else:
+                statement = select(*(getattr(cls, column) for column in RESULT_COLUMNS))
+                statement = statement.where(cls.rank_values_filter(search_query))
+                rows = UserRow.from_rows(session.exec(cls._page(statement, after_id, limit)))
+            logger.debug("get_rows_by_ranks %s after id %s: %d rows", search_query, after_id, len(rows))
+            result_cache.put(key, rows, generation)
+            return rows
+        except Exception as e:
+            logger.error(f"Error in get_rows_by_ranks: {e}")
+            raise
+
+    @classmethod
+    @metrics.track("db.get_rows_per_rank")
+    def get_rows_per_rank(cls, session: Session, limits: dict[int, int]) -> list[UserRow]:
+        """Return at most limits[rank_value] rows of each rank value, the lowest ids first, ordered by id.
+
+        The SQL path runs one LIMITed select per rank value in a single UNION
+        ALL, so each stops after its limit on the rank_value index.
+        """
+        try:
+            if rank_index.is_active(session.get_bind()):
+                rows = [row for rank_value, limit in limits.items() for row in rank_index.get([rank_value], limit=limit)]
+                return sorted(rows, key=lambda row: row.id)
+            columns = [getattr(cls, column) for column in RESULT_COLUMNS]
+            pages = [
+                select(*columns).where(cls.rank_value == rank_value).order_by(cls.id).limit(limit).subquery().select()
+                for rank_value, limit in limits.items()
+            ]
+            combined = union_all(*pages).subquery()
+            statement = select(*(combined.c[column] for column in RESULT_COLUMNS)).order_by(combined.c.id)
+            return UserRow.from_rows(session.exec(statement))
+        except Exception as e:
+            logger.error(f"Error in get_rows_per_rank: {e}")
+            return []
+
+    @metrics.track("db.update_user")
     def update_user(self, session: Session, username: str, password: str, rank: str, rank_value: int, uid: str | None = None, level: int | None = None)  -> None:
         """Update user attributes."""
         try:
 
-            if username != self.username and self.does_user_exists(session, username=username):
-                logger.warning(f"Attempted to update user in update_user, but username '{username}' already exists.")
+            if uid:
+                uid = uid.strip()
+
+            conflict = self.find_conflict(session, username, uid, exclude_id=self.id)
+            if conflict == "username":
+                logger.warning("Attempted to update user in update_user, but username '%s' already exists.", username)
                 raise UserError("A user with this username already exists.")
-            
-            if uid and uid != self.uid and self.does_user_exists(session, uid=uid):
-                logger.warning(f"Attempted to updat user in update_user, but UID '{uid}' already exists.")
+            if conflict == "uid":
+                logger.warning("Attempted to updat user in update_user, but UID '%s' already exists.", uid)
                 raise UserError("A user with this UID already exists.")
 
             self.username = username
             self.password = password
-
-            if uid:
-                uid = uid.strip()
-                
             self.uid = uid
             self.level = level
             self.rank = rank
             self.rank_value = rank_value
 
             session.add(self)
-            session.commit()
+            self._commit_unique(session, "A user with this UID already exists.")
             session.refresh(self)
+            if rank_index.is_tracking(session.get_bind()):
+                rank_index.add(UserRow.from_user(self))
+            result_cache.invalidate()
         except UserError as u_e:
             session.rollback()
-            logger.warning(f"UserError updating user {self.username}: {u_e}")
+            logger.warning("UserError updating user %s: %s", self.username, u_e)
             raise 
         except Exception as e:
             session.rollback()
@@ -127,6 +341,111 @@ class User(SQLModel, table=True):
             raise UserError("An unexpected error occurred while updating the user.")
     
     @classmethod
+    @metrics.track("db.update_user_by_id")
+    def update_user_by_id(cls, session: Session, user_id: int, username: str, password: str, rank: str, rank_value: int, uid: str | None = None, level: int | None = None) -> Optional["User"]:
+        """Update the user with the given id in one UPDATE, without loading it first.
+
+        Returns the updated user, or None if no row has that id.
+        """
+        try:
+            if uid:
+                uid = uid.strip()
+
+            conflict = cls.find_conflict(session, username, uid, exclude_id=user_id)
+            if conflict == "username":
+                logger.warning("Attempted to update user in update_user_by_id, but username '%s' already exists.", username)
+                raise UserError("A user with this username already exists.")
+            if conflict == "uid":
+                logger.warning("Attempted to update user in update_user_by_id, but UID '%s' already exists.", uid)
+                raise UserError("A user with this UID already exists.")
+
+            values = dict(username=username, password=password, uid=uid, level=level, rank=rank, rank_value=rank_value)
+            statement = update(cls).where(cls.id == user_id).values(**values).returning(*cls.__table__.columns)
+            # The UPDATE runs here rather than at commit, so its UNIQUE violations are mapped here too
+            with cls._unique_errors("A user with this UID already exists."):
+                row = session.exec(statement).first()
+            if row is None:
+                session.rollback()
+                return None
+            # The stored values, without validation (update_user accepts any level too), so nothing after the commit can raise
+            user = cls(**row._asdict())
+            cls._commit_unique(session, "A user with this UID already exists.")
+
+            if rank_index.is_tracking(session.get_bind()):
+                rank_index.add(UserRow.from_user(user))
+            result_cache.invalidate()
+            return user
+        except UserError as u_e:
+            session.rollback()
+            logger.warning("UserError updating user %s: %s", user_id, u_e)
+            raise
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error updating user {user_id}: {e}")
+            raise UserError("An unexpected error occurred while updating the user.")
+
+    @classmethod
+    @metrics.track("db.delete_user_by_id")
+    def delete_user_by_id(cls, session: Session, user_id: int) -> bool:
+        """Delete the user with the given id in one DELETE. Returns False if no row has that id."""
+        try:
+            result = session.exec(delete(cls).where(cls.id == user_id))
+            session.commit()
+            if result.rowcount == 0:
+                return False
+            if rank_index.is_tracking(session.get_bind()):
+                rank_index.remove(user_id)
+            result_cache.invalidate()
+            return True
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error deleting user in delete_user_by_id {user_id}: {e}")
+            return False
+
+    @classmethod
+    @metrics.track("db.update_users_rank")
+    def update_users_rank(cls, session: Session, user_ids: list[int], rank: str, rank_value: int) -> list["User"]:
+        """Set the rank of every listed user in one UPDATE ... WHERE id IN and return the updated users."""
+        if not user_ids:
+            return []
+        try:
+            statement = update(cls).where(cls.id.in_(user_ids)).values(rank=rank, rank_value=rank_value)
+            rows = session.exec(statement.returning(*cls.__table__.columns)).all()
+            session.commit()
+
+            # Stored values as they are: a level create_user accepted must not fail validation after the commit
+            users = [cls(**row._asdict()) for row in rows]
+            if rank_index.is_tracking(session.get_bind()):
+                for user in users:
+                    rank_index.add(UserRow.from_user(user))
+            result_cache.invalidate()
+            return users
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error updating the rank of {len(user_ids)} users in update_users_rank: {e}")
+            raise UserError("An unexpected error occurred while updating the users.")
+
+    @classmethod
+    @metrics.track("db.delete_users_by_id")
+    def delete_users_by_id(cls, session: Session, user_ids: list[int]) -> int:
+        """Delete every listed user in one DELETE ... WHERE id IN and return how many rows were removed."""
+        if not user_ids:
+            return 0
+        try:
+            result = session.exec(delete(cls).where(cls.id.in_(user_ids)))
+            session.commit()
+            if rank_index.is_tracking(session.get_bind()):
+                for user_id in user_ids:
+                    rank_index.remove(user_id)
+            result_cache.invalidate()
+            return result.rowcount
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error deleting {len(user_ids)} users in delete_users_by_id: {e}")
+            return 0
+
+    @classmethod
+    @metrics.track("db.delete_user")
     def delete_user(cls, session: Session, username: str, password: str, rank: str, rank_value: int, uid: str | None = None, level: int | None = None,) -> bool:
         """Delete a user from the database by matching all attributes."""
         try:
@@ -146,55 +465,107 @@ class User(SQLModel, table=True):
             if not user:
                 return False 
             
+            user_id = user.id
             session.delete(user)
             session.commit()
+            if rank_index.is_tracking(session.get_bind()):
+                rank_index.remove(user_id)
+            result_cache.invalidate()
             return True
         except Exception as e:
             session.rollback()
             logger.error(f"Error deleting user in delete_user {username}: {e}")
             return False
             
-engine = create_engine("sqlite:///users.db")
+def apply_sqlite_profile(db_engine, profile: str = SQLITE_PROFILE) -> None:
+    """Run the PRAGMAs of a SQLite storage profile on every new connection of a (sync) engine."""
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLite profile: {profile}")
+    pragmas = SQLITE_PROFILES[profile]
 
+    @event.listens_for(db_engine, "connect")
+    def _apply_profile(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
 
-def _table_exists(cursor: sqlite3.Cursor, table_name: str) -> bool:
-    """Check if specific table exists"""
-    cursor.execute(f"Select name from sqlite_master where type='table' and name='{table_name}'")
-    return cursor.fetchone() is not None
+def create_db_engine(path: str = DB_PATH, profile: str = SQLITE_PROFILE):
+    """Create an engine for the database file that applies a SQLite storage profile to each connection."""
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLite profile: {profile}")
+    db_engine = create_engine(f"sqlite:///{path}", pool_size=SQLITE_POOL_SIZE, max_overflow=SQLITE_MAX_OVERFLOW)
+    apply_sqlite_profile(db_engine, profile)
+    return db_engine
 
-def schema_migration(conn: sqlite3.Connection | None = None) -> None:
-    #connect to sqlite3 db
+engine = create_db_engine()
+
+def schema_migration(conn: sqlite3.Connection | None = None) -> bool:
+    """Move rows from the legacy users table into usersv2 on the given connection.
+
+    Kept for callers of the old one-shot migration; init_db now runs it as part
+    of the versioned migrations in app.utils.migrations.
+    """
     try:
         if conn is None:
-            conn = sqlite3.connect("users.db")
-        cursor = conn.cursor()
-
-        #check if old users table exists
-        if _table_exists(cursor, "users"):
-            #insert old users into new usersv2 table
-            logger.info("Old users table exists. Inserting users into new table...")
-            cursor.execute("""
-                        INSERT INTO usersv2 (username, password, rank,rank_value)
-                        Select username, password, rank, rank_value from users
-                        """)
-            cursor.execute("DROP TABLE users;")
-            conn.commit()
-        else:
-            logger.info("Old users table does not exist.")
+            conn = engine.raw_connection()
+        conn.cursor().execute("BEGIN")
+        copy_legacy_users(conn)
+        conn.commit()
+        return True
     except Exception as e:
         logger.error(f"Error in init_db: {e}")
         conn.rollback()
+        return False
     finally:
         conn.close()
 
+@event.listens_for(User.__table__, "after_create")
+def _create_username_search_after_create(target, connection, **kw) -> None:
+    create_username_search(connection.connection)
+
+def has_username_search(session: Session) -> bool:
+    """Check (once per engine) whether the username search table exists."""
+    bind = session.get_bind()
+    if bind not in _username_search_engines:
+        statement = text("SELECT 1 FROM sqlite_master WHERE type='table' AND name=:name")
+        _username_search_engines[bind] = session.exec(statement, params={"name": USERNAME_SEARCH_TABLE}).first() is not None
+    return _username_search_engines[bind]
+
 def init_db(engine=engine) -> None:         
-    """Initialize the database"""
+    """Initialize the database by applying any pending schema migrations."""
     if engine is None:
         raise ValueError("Database engine is not initialized.")
     try:
-        SQLModel.metadata.create_all(engine)
-        schema_migration()
+        conn = engine.raw_connection()
+        try:
+            version = get_version(conn)
+            if version == SCHEMA_VERSION:
+                logger.info(f"Database schema is at version {version}, skipping migration.")
+            else:
+                with startup_timer.phase("migration"):
+                    version = migrate(conn)
+                logger.info(f"Database schema migrated to version {version}.")
+        finally:
+            conn.close()
+        _username_search_engines.pop(engine, None)
         logger.info("Database initialized successfully.")
     except Exception as e:
         logger.error(f"Error initializing database in init_db: {e}")
         raise RuntimeError("Failed to initialize the database.") from e
+
+def load_rank_index(session: Session) -> None:
+    """Load every user into the in-memory rank index.
+
+    Writes may commit while this runs (the TUI loads it in a worker); they are
+    logged from before the SELECT and replayed by rank_index.load().
+    """
+    try:
+        bind = session.get_bind()
+        rank_index.start_loading(bind)
+        rows = session.exec(select(*(getattr(User, column) for column in RESULT_COLUMNS)))
+        rank_index.load(bind, UserRow.from_rows(rows))
+        logger.info(f"Rank index loaded with {len(rank_index)} users.")
+    except Exception as e:
+        rank_index.clear()
+        logger.error(f"Error loading rank index in load_rank_index: {e}")
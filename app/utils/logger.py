@@ -1,5 +1,11 @@
+import atexit
+import gzip
 import logging
 import os
+import queue
+import shutil
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from app.utils.config import LOG_BACKUP_COUNT, LOG_COMPRESS, LOG_LEVEL, LOG_MAX_BYTES
 
 # Ensure the "logs/" directory exists
 log_dir = os.path.join(os.path.dirname(__file__), "..", "logs")  
@@ -8,14 +14,37 @@ os.makedirs(log_dir, exist_ok=True)
 # Define log file path
 log_file = os.path.join(log_dir, "app.log")
 
+
+def _gzip_rotator(source: str, dest: str) -> None:
+    """Compress a rotated log file instead of just renaming it."""
+    with open(source, "rb") as plain, gzip.open(dest, "wb") as compressed:
+        shutil.copyfileobj(plain, compressed)
+    os.remove(source)
+
+
+def create_file_handler(path: str = log_file, max_bytes: int = LOG_MAX_BYTES, backup_count: int = LOG_BACKUP_COUNT, compress: bool = LOG_COMPRESS) -> RotatingFileHandler:
+    """Size-rotated file handler; rotated files become app.log.1(.gz) ... app.log.N(.gz)."""
+    handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    if compress:
+        handler.namer = lambda name: f"{name}.gz"
+        handler.rotator = _gzip_rotator
+    return handler
+
+
+def _resolve_level(name: str) -> int:
+    level = logging.getLevelName(name)
+    return level if isinstance(level, int) else logging.INFO
+
+
 # Create a custom logger
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)  # Set global log level
-
-# Create file handler (only log to file)
-f_handler = logging.FileHandler(log_file)
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-f_handler.setFormatter(formatter)
+logger.setLevel(_resolve_level(LOG_LEVEL))
 
-# Add only the file handler (no console output)
-logger.addHandler(f_handler)
+# Callers only enqueue records; a background thread formats them and writes the file.
+log_queue: queue.SimpleQueue = queue.SimpleQueue()
+logger.addHandler(QueueHandler(log_queue))
+listener = QueueListener(log_queue, create_file_handler(), respect_handler_level=True)
+listener.start()
+# Drain the queue and close the file before the interpreter exits
+atexit.register(listener.stop)
@@ -0,0 +1,129 @@
+import inspect
+import json
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Iterator
+from app.utils.config import METRICS_BUCKETS_MS, METRICS_WINDOW
+
+
+class OperationStats:
+    """Call count, error count and latencies of one named operation.
+
+    The histogram covers every call; percentiles come from a ring buffer of
+    the last `window` latencies, so memory stays fixed however long the app runs.
+    """
+
+    def __init__(self, window: int = METRICS_WINDOW, buckets_ms: tuple[float, ...] = METRICS_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        # One bucket per bound plus an overflow bucket for anything slower
+        self.histogram = [0] * (len(buckets_ms) + 1)
+        self.recent: deque[float] = deque(maxlen=window)
+
+    def record(self, elapsed_ms: float, failed: bool = False) -> None:
+        self.count += 1
+        self.errors += failed
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.histogram[bisect_left(self.buckets_ms, elapsed_ms)] += 1
+        self.recent.append(elapsed_ms)
+
+    def percentile(self, fraction: float) -> float:
+        """Nearest-rank percentile of the recent latencies, 0.0 before the first call."""
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered) + 0.5) - 1))]
+
+    def summary(self) -> dict:
+        labels = [f"<={bound:g}ms" for bound in self.buckets_ms] + [f">{self.buckets_ms[-1]:g}ms"]
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": self.max_ms,
+            "histogram": dict(zip(labels, self.histogram)),
+        }
+
+
+class Metrics:
+    """Registry of OperationStats keyed by operation name, e.g. "db.create_user"."""
+
+    def __init__(self, window: int = METRICS_WINDOW):
+        self.window = window
+        self.operations: dict[str, OperationStats] = {}
+        # Workers and the sync session threads record concurrently
+        self._lock = threading.Lock()
+
+    def record(self, name: str, elapsed_ms: float, failed: bool = False) -> None:
+        with self._lock:
+            stats = self.operations.get(name)
+            if stats is None:
+                stats = self.operations[name] = OperationStats(self.window)
+            stats.record(elapsed_ms, failed)
+
+    @contextmanager
+    def timed(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as one call of `name`; an exception counts as an error.
+
+        Cancelled workers raise CancelledError, which is not an Exception, so they are not recorded.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.record(name, (time.perf_counter() - start) * 1000, failed=True)
+            raise
+        self.record(name, (time.perf_counter() - start) * 1000)
+
+    def track(self, name: str) -> Callable[[Callable], Callable]:
+        """Decorator form of timed() for plain functions and coroutine functions."""
+        def decorate(func: Callable) -> Callable:
+            if inspect.iscoroutinefunction(func):
+                @wraps(func)
+                async def run_async(*args, **kwargs):
+                    with self.timed(name):
+                        return await func(*args, **kwargs)
+                return run_async
+
+            @wraps(func)
+            def run(*args, **kwargs):
+                with self.timed(name):
+                    return func(*args, **kwargs)
+            return run
+        return decorate
+
+    def snapshot(self) -> dict[str, dict]:
+        with self._lock:
+            return {name: stats.summary() for name, stats in sorted(self.operations.items())}
+
+    def report(self) -> str:
+        lines = [f"{'Operation':<28} {'calls':>7} {'errors':>6} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}"]
+        for name, stats in self.snapshot().items():
+            lines.append(
+                f"{name:<28} {stats['count']:>7} {stats['errors']:>6} "
+                f"{stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['max_ms']:>9.2f}"
+            )
+        return "\n".join(lines)
+
+    def dump(self, path: str) -> None:
+        """Write the snapshot as JSON."""
+        with open(path, "w", encoding="utf-8") as stream:
+            json.dump({"window": self.window, "operations": self.snapshot()}, stream, indent=2)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.operations.clear()
+
+
+metrics = Metrics()
@@ -0,0 +1,169 @@
+"""Ordered, versioned schema migrations.
+
+The schema version lives in ``PRAGMA user_version``. Each Migration runs in
+its own transaction together with the version bump, so a failed step leaves
+the database at the previous version and is retried on the next launch.
+Functions here work on DBAPI (sqlite3) connections, e.g. engine.raw_connection().
+"""
+from dataclasses import dataclass
+from typing import Callable
+from app.utils.config import USERNAME_SEARCH_TABLE
+from app.utils.logger import logger
+
+# Rows moved per transaction when copying a large legacy table
+MIGRATION_BATCH_SIZE = 5000
+
+USERNAME_SEARCH_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {USERNAME_SEARCH_TABLE}
+        USING fts5(username, content='usersv2', content_rowid='id', tokenize='trigram')""",
+    f"""CREATE TRIGGER IF NOT EXISTS {USERNAME_SEARCH_TABLE}_ai AFTER INSERT ON usersv2 BEGIN
+        INSERT INTO {USERNAME_SEARCH_TABLE}(rowid, username) VALUES (new.id, new.username);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {USERNAME_SEARCH_TABLE}_ad AFTER DELETE ON usersv2 BEGIN
+        INSERT INTO {USERNAME_SEARCH_TABLE}({USERNAME_SEARCH_TABLE}, rowid, username) VALUES ('delete', old.id, old.username);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {USERNAME_SEARCH_TABLE}_au AFTER UPDATE ON usersv2 BEGIN
+        INSERT INTO {USERNAME_SEARCH_TABLE}({USERNAME_SEARCH_TABLE}, rowid, username) VALUES ('delete', old.id, old.username);
+        INSERT INTO {USERNAME_SEARCH_TABLE}(rowid, username) VALUES (new.id, new.username);
+    END""",
+]
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    upgrade: Callable
+
+
+def _table_exists(cursor, table_name: str) -> bool:
+    """Check if specific table exists"""
+    cursor.execute("Select name from sqlite_master where type='table' and name=?", (table_name,))
+    return cursor.fetchone() is not None
+
+
+def create_usersv2(conn) -> None:
+    """Create the usersv2 table and its unique indexes."""
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS usersv2 (
+            id INTEGER NOT NULL,
+            username VARCHAR NOT NULL,
+            password VARCHAR NOT NULL,
+            uid VARCHAR,
+            level INTEGER,
+            rank VARCHAR NOT NULL,
+            rank_value INTEGER NOT NULL,
+            PRIMARY KEY (id)
+        )""")
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS ix_usersv2_username ON usersv2 (username)")
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS ix_usersv2_uid ON usersv2 (uid)")
+
+
+def copy_legacy_users(conn, batch_size: int | None = None) -> int:
+    """Move rows from the old users table into usersv2, then drop it.
+
+    Rows are moved batch_size at a time; each batch is inserted into usersv2
+    and deleted from users in one committed transaction, so the copy never
+    holds the write lock for long and resumes where it stopped if interrupted.
+    The final DROP is left uncommitted for the caller's transaction.
+    """
+    batch_size = batch_size or MIGRATION_BATCH_SIZE
+    cursor = conn.cursor()
+    if not _table_exists(cursor, "users"):
+        logger.info("Old users table does not exist.")
+        return 0
+
+    logger.info("Old users table exists. Inserting users into new table...")
+    copied = 0
+    while True:
+        cursor.execute("""
+                    INSERT INTO usersv2 (username, password, rank, rank_value)
+                    SELECT username, password, rank, rank_value FROM users ORDER BY rowid LIMIT ?
+                    """, (batch_size,))
+        moved = cursor.rowcount
+        if moved <= 0:
+            break
+        cursor.execute("DELETE FROM users WHERE rowid IN (SELECT rowid FROM users ORDER BY rowid LIMIT ?)", (batch_size,))
+        conn.commit()
+        cursor.execute("BEGIN")
+        copied += moved
+        logger.info(f"Copied {copied} users from the old users table.")
+    cursor.execute("DROP TABLE users;")
+    return copied
+
+
+def create_username_search(conn) -> bool:
+    """Create the FTS5 trigram username index and its sync triggers if missing."""
+    cursor = conn.cursor()
+    try:
+        exists = _table_exists(cursor, USERNAME_SEARCH_TABLE)
+        for statement in USERNAME_SEARCH_DDL:
+            cursor.execute(statement)
+        if not exists:
+            cursor.execute(f"INSERT INTO {USERNAME_SEARCH_TABLE}({USERNAME_SEARCH_TABLE}) VALUES ('rebuild')")
+        return True
+    except Exception as e:
+        logger.warning(f"Username search index unavailable, falling back to ILIKE: {e}")
+        return False
+
+
+def create_username_nocase_index(conn) -> None:
+    """Index usernames case-insensitively so uniqueness checks are a single index probe.
+
+    Databases that already hold usernames differing only in case keep a
+    non-unique index instead of failing the migration.
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT 1 FROM usersv2 GROUP BY username COLLATE NOCASE HAVING COUNT(*) > 1 LIMIT 1")
+    if cursor.fetchone() is None:
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS ix_usersv2_username_nocase ON usersv2 (username COLLATE NOCASE)")
+    else:
+        logger.warning("Usernames differing only in case exist; creating a non-unique case-insensitive index.")
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_usersv2_username_nocase ON usersv2 (username COLLATE NOCASE)")
+
+
+def create_rank_value_index(conn) -> None:
+    """Index rank_value, the column every rank search filters on."""
+    conn.cursor().execute("CREATE INDEX IF NOT EXISTS ix_usersv2_rank_value_username ON usersv2 (rank_value, username)")
+
+
+def _migrate_v1(conn) -> None:
+    create_usersv2(conn)
+    copy_legacy_users(conn)
+
+
+MIGRATIONS = [
+    Migration(1, "create usersv2 and move rows from the legacy users table", _migrate_v1),
+    Migration(2, "FTS5 trigram index on usersv2.username", create_username_search),
+    Migration(3, "case-insensitive index on usersv2.username", create_username_nocase_index),
+    Migration(4, "index on usersv2 (rank_value, username)", create_rank_value_index),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+def get_version(conn) -> int:
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA user_version")
+    return cursor.fetchone()[0]
+
+
+def migrate(conn, migrations: list[Migration] = MIGRATIONS) -> int:
+    """Apply every migration newer than the stored version and return the new version."""
+    version = get_version(conn)
+    cursor = conn.cursor()
+    for migration in migrations:
+        if migration.version <= version:
+            continue
+        logger.info(f"Applying schema migration {migration.version}: {migration.description}")
+        try:
+            cursor.execute("BEGIN")
+            migration.upgrade(conn)
+            cursor.execute(f"PRAGMA user_version = {migration.version}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        version = migration.version
+    return version
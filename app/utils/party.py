@@ -0,0 +1,83 @@
+"""Find accounts that can queue with a whole party.
+
+A party is a list of rank values. The ranks an account may have to join it
+are the intersection of every member's window, computed as an AND of the
+precomputed bitmasks in rank_utils, so the database sees one rank filter.
+"""
+from sqlmodel import Session
+from app.utils.dbo import User
+from app.utils.rank_utils import RANK_MAP, mask_ranks, party_mask
+from app.utils.user_row import UserRow
+
+
+def party_rank_values(ranks: list[str]) -> list[int]:
+    """Map rank names to rank values, raising ValueError for an unknown rank."""
+    try:
+        return [RANK_MAP[rank] for rank in ranks]
+    except KeyError as e:
+        raise ValueError(f"Unknown rank: {e.args[0]}") from e
+
+
+def find_party_accounts(session: Session, member_ranks: list[int], after_id: int | None = None, limit: int | None = None) -> list[UserRow]:
+    """Return the accounts that can queue with every member, ordered by id."""
+    valid_ranks = mask_ranks(party_mask(member_ranks))
+    if not valid_ranks:
+        return []
+    return User.get_rows_by_ranks(session, list(valid_ranks), after_id=after_id, limit=limit)
+
+
+def _match_slots(slot_masks: list[int], capacity: dict[int, int]) -> list[int | None]:
+    """Assign each slot a rank value with spare capacity, maximizing the number of filled slots.
+
+    Augmenting paths over the 21 rank values rather than individual accounts,
+    so the cost does not grow with the size of the roster.
+    """
+    holders: dict[int, list[int]] = {rank: [] for rank in capacity}
+    assigned: list[int | None] = [None] * len(slot_masks)
+
+    def augment(slot: int, seen: set[int]) -> bool:
+        for rank in mask_ranks(slot_masks[slot]):
+            if rank not in capacity or rank in seen:
+                continue
+            seen.add(rank)
+            if len(holders[rank]) < capacity[rank]:
+                holders[rank].append(slot)
+                assigned[slot] = rank
+                return True
+            for other in holders[rank]:
+                if augment(other, seen):
+                    holders[rank].remove(other)
+                    holders[rank].append(slot)
+                    assigned[slot] = rank
+                    return True
+        return False
+
+    for slot in range(len(slot_masks)):
+        augment(slot, set())
+    return assigned
+
+
+def assign_party_accounts(session: Session, parties: list[list[int]]) -> list[UserRow | None]:
+    """Give each party a distinct account that can queue with all of its members.
+
+    Returns one entry per party, None where no account is left for it. The
+    candidates for every party are loaded with a single query, capped per
+    rank value at the number of parties that accept it, since no more
+    accounts of that rank could ever be handed out.
+    """
+    slot_masks = [party_mask(members) for members in parties]
+    limits: dict[int, int] = {}
+    for mask in slot_masks:
+        for rank in mask_ranks(mask):
+            limits[rank] = limits.get(rank, 0) + 1
+    if not limits:
+        return [None] * len(parties)
+
+    buckets: dict[int, list[UserRow]] = {}
+    for user in User.get_rows_per_rank(session, limits):
+        buckets.setdefault(user.rank_value, []).append(user)
+
+    assigned = _match_slots(slot_masks, {rank: len(users) for rank, users in buckets.items()})
+    # Hand out the lowest ids first within each rank
+    remaining = {rank: iter(users) for rank, users in buckets.items()}
+    return [None if rank is None else next(remaining[rank]) for rank in assigned]
@@ -0,0 +1,115 @@
+import cProfile
+import inspect
+import os
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Iterator
+from app.utils.config import PROFILE_ENABLED, PROFILE_MAX_FILES, PROFILE_MIN_MS, PROFILE_SAMPLE_EVERY
+from app.utils.logger import log_dir, logger
+
+# Profiles are written here as <name>-<timestamp>-<n>.prof, readable with pstats or snakeviz
+profile_dir = os.path.join(log_dir, "profiles")
+
+
+class HandlerProfiler:
+    """Opt-in cProfile capture of single handler invocations.
+
+    Only one profile runs at a time (cProfile cannot nest), so handlers that
+    start while another is being profiled are skipped. Only every
+    `sample_every`-th call of each handler is profiled, calls faster than
+    `min_ms` are discarded, and at most `max_files` profiles are written per run.
+    When disabled, wrap() returns the handler unchanged.
+    """
+
+    def __init__(self, enabled: bool = False, output_dir: str = profile_dir, sample_every: int = 1, max_files: int = 50, min_ms: float = 0.0):
+        self.enabled = enabled
+        self.output_dir = output_dir
+        self.sample_every = max(1, sample_every)
+        self.max_files = max_files
+        self.min_ms = min_ms
+        self.calls: dict[str, int] = {}
+        self.written: list[str] = []
+        self._active: cProfile.Profile | None = None
+        self._active_name: str | None = None
+        self._started = 0.0
+
+    def start(self, name: str) -> cProfile.Profile | None:
+        """Start profiling one call of `name`, or return None if this call is not sampled."""
+        if not self.enabled or self._active is not None or len(self.written) >= self.max_files:
+            return None
+        calls = self.calls[name] = self.calls.get(name, 0) + 1
+        if (calls - 1) % self.sample_every:
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler (a debugger, coverage) already owns the hook
+            return None
+        self._active = profile
+        self._active_name = name
+        self._started = time.perf_counter()
+        return profile
+
+    def stop(self, name: str, profile: cProfile.Profile | None) -> str | None:
+        """Stop a profile returned by start() and write it; returns the file path if one was written."""
+        if profile is None:
+            return None
+        profile.disable()
+        self._active = self._active_name = None
+        elapsed_ms = (time.perf_counter() - self._started) * 1000
+        if elapsed_ms < self.min_ms:
+            return None
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{len(self.written) + 1}.prof")
+        try:
+            profile.dump_stats(path)
+        except OSError as e:
+            logger.error(f"Failed to write profile {path}: {e}")
+            return None
+        self.written.append(path)
+        logger.info("Profiled %s in %.1f ms: %s", name, elapsed_ms, path)
+        return path
+
+    def finish(self, name: str) -> str | None:
+        """Stop the running profile if it was started as `name`, e.g. from a later callback."""
+        if self._active is None or self._active_name != name:
+            return None
+        return self.stop(name, self._active)
+
+    @contextmanager
+    def profile(self, name: str) -> Iterator[None]:
+        profile = self.start(name)
+        try:
+            yield
+        finally:
+            self.stop(name, profile)
+
+    def wrap(self, name: str | None = None) -> Callable[[Callable], Callable]:
+        """Decorator that profiles calls of a plain or coroutine function, named after it by default."""
+        def decorate(func: Callable) -> Callable:
+            if not self.enabled:
+                return func
+            label = name or func.__name__
+            if inspect.iscoroutinefunction(func):
+                @wraps(func)
+                async def run_async(*args, **kwargs):
+                    with self.profile(label):
+                        return await func(*args, **kwargs)
+                return run_async
+
+            @wraps(func)
+            def run(*args, **kwargs):
+                with self.profile(label):
+                    return func(*args, **kwargs)
+            return run
+        return decorate
+
+
+profiler = HandlerProfiler(
+    enabled=PROFILE_ENABLED,
+    sample_every=PROFILE_SAMPLE_EVERY,
+    max_files=PROFILE_MAX_FILES,
+    min_ms=PROFILE_MIN_MS,
+)
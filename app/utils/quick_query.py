@@ -0,0 +1,53 @@
+"""Read-only account lookups on the plain sqlite3 driver.
+
+Used by the command line query mode, which has to start in tens of
+milliseconds and so cannot afford to import SQLModel/SQLAlchemy or Textual.
+The SQL mirrors User.get_users_by_ranks and User.get_users_by_username.
+"""
+import sqlite3
+from app.utils.config import DB_PATH, MIN_TRIGRAM_QUERY, USERNAME_SEARCH_TABLE
+from app.utils.rank_utils import RANK_MAP, as_window, mask_ranks, match_rank, party_mask, rank_window
+
+QUERY_COLUMNS = ("id", "username", "password", "uid", "level", "rank", "rank_value")
+_SELECT = f"SELECT {', '.join(QUERY_COLUMNS)} FROM usersv2"
+
+
+def connect(path: str = DB_PATH) -> sqlite3.Connection:
+    """Open the database read-only, raising sqlite3.OperationalError if it does not exist."""
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def users_by_rank(conn: sqlite3.Connection, rank: str) -> list[sqlite3.Row]:
+    """Return the accounts that can queue with the named rank."""
+    rank_match = match_rank(rank)
+    if rank_match is None:
+        raise ValueError(f"Unknown rank: {rank}")
+    # Every rank's window is one contiguous range (see rank_utils.RANK_WINDOWS)
+    return conn.execute(f"{_SELECT} WHERE rank_value BETWEEN ? AND ? ORDER BY id", rank_window(RANK_MAP[rank_match])).fetchall()
+
+
+def users_by_party(conn: sqlite3.Connection, ranks: list[str]) -> list[sqlite3.Row]:
+    """Return the accounts that can queue with every one of the named ranks."""
+    rank_matches = [match_rank(rank) for rank in ranks]
+    if None in rank_matches:
+        raise ValueError(f"Unknown rank: {ranks[rank_matches.index(None)]}")
+    valid_ranks = mask_ranks(party_mask(RANK_MAP[rank] for rank in rank_matches))
+    if not valid_ranks:
+        return []
+    # Windows are ranges, so their intersection is one too
+    return conn.execute(f"{_SELECT} WHERE rank_value BETWEEN ? AND ? ORDER BY id", as_window(valid_ranks)).fetchall()
+
+
+def users_by_username(conn: sqlite3.Connection, search_query: str) -> list[sqlite3.Row]:
+    """Return the accounts whose username contains search_query (case-insensitive)."""
+    pattern = f"%{search_query}%"
+    has_search_table = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (USERNAME_SEARCH_TABLE,)
+    ).fetchone() is not None
+    if has_search_table and len(search_query) >= MIN_TRIGRAM_QUERY:
+        statement = f"{_SELECT} WHERE id IN (SELECT rowid FROM {USERNAME_SEARCH_TABLE} WHERE username LIKE ?) ORDER BY id"
+    else:
+        statement = f"{_SELECT} WHERE lower(username) LIKE lower(?) ORDER BY id"
+    return conn.execute(statement, (pattern,)).fetchall()
@@ -0,0 +1,109 @@
+import heapq
+import threading
+from typing import Any, Iterable
+
+
+class RankIndex:
+    """In-memory index of users grouped into buckets by rank_value.
+
+    The index is loaded once from the database and then kept in sync by the
+    User write methods, so rank searches can be answered by merging a few
+    buckets instead of issuing a ``rank_value IN (...)`` query. Searches may run
+    on a worker thread, so every access goes through a lock.
+
+    Loading can run while writes are accepted: after start_loading() the writes
+    are logged, and load() replays them on top of the rows it was given, so a
+    write that committed after the loading SELECT is not lost.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._bind = None
+        self._buckets: dict[int, dict[int, Any]] = {}
+        self._loading_bind = None
+        # (user, None) for an add, (None, user_id) for a remove, in commit order
+        self._pending: list[tuple[Any, int | None]] = []
+        self._lock = threading.Lock()
+
+    def start_loading(self, bind) -> None:
+        """Log writes made on bind from now on, until load() replays them."""
+        with self._lock:
+            self._loading_bind = bind
+            self._pending = []
+
+    def load(self, bind, users: Iterable[Any]) -> None:
+        """Replace the index contents with the given users for a database bind."""
+        buckets: dict[int, dict[int, Any]] = {}
+        for user in users:
+            buckets.setdefault(user.rank_value, {})[user.id] = user
+        with self._lock:
+            self._buckets = buckets
+            self._bind = bind
+            if self._loading_bind is bind:
+                for user, user_id in self._pending:
+                    if user is not None:
+                        self._add(user)
+                    else:
+                        self._remove(user_id)
+            self._loading_bind = None
+            self._pending = []
+
+    def clear(self) -> None:
+        """Drop all buckets and detach the index from its database."""
+        with self._lock:
+            self._buckets = {}
+            self._bind = None
+            self._loading_bind = None
+            self._pending = []
+
+    def is_active(self, bind) -> bool:
+        """Check if the index is enabled and was loaded from the given bind."""
+        return self.enabled and self._bind is not None and self._bind is bind
+
+    def is_tracking(self, bind) -> bool:
+        """Check if writes on the given bind must be passed to add() and remove(): loaded or loading."""
+        return self.is_active(bind) or (self.enabled and self._loading_bind is not None and self._loading_bind is bind)
+
+    def add(self, user: Any) -> None:
+        """Insert or replace a user in its rank bucket."""
+        with self._lock:
+            if self._loading_bind is not None:
+                self._pending.append((user, None))
+            self._add(user)
+
+    def remove(self, user_id: int) -> None:
+        """Remove a user from whichever bucket holds it."""
+        with self._lock:
+            if self._loading_bind is not None:
+                self._pending.append((None, user_id))
+            self._remove(user_id)
+
+    def _add(self, user: Any) -> None:
+        self._remove(user.id)
+        self._buckets.setdefault(user.rank_value, {})[user.id] = user
+
+    def _remove(self, user_id: int) -> None:
+        for bucket in self._buckets.values():
+            if bucket.pop(user_id, None) is not None:
+                return
+
+    def get(self, rank_values: Iterable[int], after_id: int | None = None, limit: int | None = None) -> list[Any]:
+        """Return the users in the given rank buckets, ordered by id.
+
+        after_id and limit select one keyset page of the merged result.
+        """
+        results: list[Any] = []
+        with self._lock:
+            for rank_value in set(rank_values):
+                bucket = self._buckets.get(rank_value, {}).values()
+                if after_id is not None:
+                    bucket = [user for user in bucket if user.id > after_id]
+                results.extend(bucket)
+        if limit is not None:
+            return heapq.nsmallest(limit, results, key=lambda user: user.id)
+        results.sort(key=lambda user: user.id)
+        return results
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(bucket) for bucket in self._buckets.values())
@@ -1,18 +1,92 @@
+from typing import Iterable
 
-def get_valid_ranks(rank_value:int, RANK_MAP: dict[str,int], RANKS: list[str]) -> list[int]:
-        valid_ranks: list[int] = []
+# Rank Mapping from highest to lowest
+RANKS = [
+    "Celestial 1", "Celestial 2", "Celestial 3",
+    "Grand Master 1", "Grand Master 2", "Grand Master 3",
+    "Diamond 1", "Diamond 2", "Diamond 3",
+    "Platinum 1", "Platinum 2", "Platinum 3",
+    "Gold 1", "Gold 2", "Gold 3",
+    "Silver 1", "Silver 2", "Silver 3",
+    "Bronze 1", "Bronze 2", "Bronze 3"
+]
+RANK_MAP = {rank: i for i, rank in enumerate(reversed(RANKS))}
 
-        # If rank is in Bronze or Silver
-        if RANK_MAP["Bronze 3"] <= rank_value <= RANK_MAP["Silver 1"]:
-            valid_ranks.extend(range(0, 9))
+def match_rank(search_query: str) -> str | None:
+    """Return the rank named by the query (case-insensitive), if any."""
+    for rank in RANK_MAP:
+        if rank.lower() == search_query.strip().lower():
+            return rank
+    return None
 
-        # If rank is in Gold
-        elif RANK_MAP["Gold 3"] <= rank_value <= RANK_MAP["Gold 1"]:
-            valid_ranks.extend(range(0, 9))
-            valid_ranks.extend(range(rank_value + 1, rank_value + 4))
 
-        # If rank is in Platinum, Diamond, or Grand Master
-        elif RANK_MAP["Platinum 3"] <= rank_value <= RANK_MAP["Celestial 1"]:
-            valid_ranks.extend(range(max(rank_value - 3, 0), min(rank_value + 4, len(RANKS))))
+def _compute_valid_ranks(rank_value: int) -> tuple[int, ...]:
+    """Rank values that can queue with rank_value, by the in-game tier rules."""
+    # Bronze and Silver can queue with anyone up to Gold 1
+    if RANK_MAP["Bronze 3"] <= rank_value <= RANK_MAP["Silver 1"]:
+        return tuple(range(0, RANK_MAP["Gold 1"] + 1))
 
-        return valid_ranks
+    # Gold additionally reaches three divisions up
+    if RANK_MAP["Gold 3"] <= rank_value <= RANK_MAP["Gold 1"]:
+        return tuple(range(0, max(RANK_MAP["Gold 1"], rank_value + 3) + 1))
+
+    # Platinum and above are limited to three divisions either way
+    if RANK_MAP["Platinum 3"] <= rank_value <= RANK_MAP["Celestial 1"]:
+        return tuple(range(max(rank_value - 3, 0), min(rank_value + 4, len(RANKS))))
+
+    return ()
+
+
+def as_window(rank_values: tuple[int, ...] | list[int]) -> tuple[int, int] | None:
+    """Return (low, high) if rank_values is exactly the values low..high, else None."""
+    if not rank_values:
+        return None
+    low, high = min(rank_values), max(rank_values)
+    if high - low + 1 != len(rank_values) or len(set(rank_values)) != len(rank_values):
+        return None
+    return low, high
+
+
+# Compatibility tables indexed by rank value, built once at import
+VALID_RANKS: tuple[tuple[int, ...], ...] = tuple(_compute_valid_ranks(value) for value in range(len(RANKS)))
+VALID_RANK_MASKS: tuple[int, ...] = tuple(sum(1 << rank for rank in ranks) for ranks in VALID_RANKS)
+RANK_WINDOWS: tuple[tuple[int, int] | None, ...] = tuple(as_window(ranks) for ranks in VALID_RANKS)
+
+
+def get_valid_ranks(rank_value: int) -> tuple[int, ...]:
+    """Return the sorted rank values that can queue with rank_value."""
+    return VALID_RANKS[rank_value]
+
+
+def valid_rank_mask(rank_value: int) -> int:
+    """Return get_valid_ranks(rank_value) as a bitmask, bit i set for rank value i."""
+    return VALID_RANK_MASKS[rank_value]
+
+
+def rank_window(rank_value: int) -> tuple[int, int] | None:
+    """Return the (low, high) bounds of get_valid_ranks(rank_value) when they form one range."""
+    return RANK_WINDOWS[rank_value]
+
+
+def party_mask(rank_values: Iterable[int]) -> int:
+    """Bitmask of the rank values that can queue with every one of rank_values."""
+    mask = 0
+    for i, rank_value in enumerate(rank_values):
+        mask = VALID_RANK_MASKS[rank_value] if i == 0 else mask & VALID_RANK_MASKS[rank_value]
+    return mask
+
+
+def mask_ranks(mask: int) -> tuple[int, ...]:
+    """Return the rank values whose bits are set in mask, in ascending order."""
+    return tuple(value for value in range(len(RANKS)) if mask >> value & 1)
+
+
+def match_party(search_query: str) -> list[str] | None:
+    """Return the ranks of a comma separated party such as "Gold 3, Platinum 1", if every part is a rank."""
+    parts = [part for part in search_query.split(",") if part.strip()]
+    if len(parts) < 2:
+        return None
+    ranks = [match_rank(part) for part in parts]
+    if None in ranks:
+        return None
+    return ranks
@@ -0,0 +1,94 @@
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+def result_size(rows: list) -> int:
+    """Approximate memory held by a result list: the list, each row and the row's field values."""
+    size = sys.getsizeof(rows)
+    for row in rows:
+        size += sys.getsizeof(row)
+        for name in getattr(row, "__slots__", ()):
+            size += sys.getsizeof(getattr(row, name))
+    return size
+
+
+class ResultCache:
+    """LRU cache of search results, invalidated by a write generation counter.
+
+    Every write bumps the generation and drops all entries. A search reads the
+    generation before it queries and passes it to put(), so results computed
+    while a write was committing are never stored. Entries are evicted least
+    recently used first once either max_entries or max_bytes is exceeded.
+    Searches may run on a worker thread, so every access goes through a lock.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, enabled: bool = True):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+        self._entries: OrderedDict[Hashable, tuple[list, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> list | None:
+        """Return a copy of the cached result for key, or None on a miss."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(entry[0])
+
+    def put(self, key: Hashable, rows: list, generation: int) -> None:
+        """Store a result computed under `generation`, unless a write has happened since."""
+        if not self.enabled:
+            return
+        size = result_size(rows)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if generation != self.generation:
+                return
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            self._entries[key] = (list(rows), size)
+            self.bytes += size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def invalidate(self) -> None:
+        """Start a new generation after a write and drop every cached result."""
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "generation": self.generation,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,47 @@
+from typing import Any, Callable
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+# Rows fetched per window when the results table asks for more
+PAGE_SIZE = 200
+
+
+class ResultPager:
+    """Keyset pagination over a search, fetching one window of rows at a time.
+
+    fetch is called as fetch(session, after_id, limit) and must return rows
+    ordered by id, e.g. a partial of User.get_users_by_ranks. A short page
+    marks the search exhausted, so fetch must raise rather than return an
+    empty page when it fails. matches, when given, tells whether a single row
+    belongs to the search so the table can apply row changes without re-running it.
+    """
+
+    def __init__(self, fetch: Callable[[Session, int | None, int], list[Any]], page_size: int = PAGE_SIZE, matches: Callable[[Any], bool] | None = None):
+        self.fetch = fetch
+        self.matches = matches
+        self.page_size = page_size
+        self.last_id: int | None = None
+        self.exhausted = False
+
+    def next_page(self, session: Session) -> list[Any]:
+        """Fetch the rows after the last one returned so far."""
+        if self.exhausted:
+            return []
+        return self._advance(self.fetch(session, self.last_id, self.page_size))
+
+    async def next_page_async(self, session: AsyncSession) -> list[Any]:
+        """Like next_page, running the same fetch through an AsyncSession."""
+        if self.exhausted:
+            return []
+        return self._advance(await session.run_sync(self.fetch, self.last_id, self.page_size))
+
+    def _advance(self, rows: list[Any]) -> list[Any]:
+        if len(rows) < self.page_size:
+            self.exhausted = True
+        if rows:
+            self.last_id = rows[-1].id
+        return rows
+
+    def is_loaded(self, user_id: int) -> bool:
+        """Check if a row with this id falls inside the pages fetched so far."""
+        return self.exhausted or (self.last_id is not None and user_id <= self.last_id)
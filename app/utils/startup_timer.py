@@ -0,0 +1,41 @@
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+# Set RIVALS_STARTUP_TIMING=1 to report how long each startup phase takes.
+STARTUP_TIMING_ENV = "RIVALS_STARTUP_TIMING"
+
+
+class StartupTimer:
+    """Collects wall-clock timings of the phases between launch and first paint."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.phases: list[tuple[str, float]] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as one named phase."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def mark(self, name: str) -> None:
+        """Record a milestone as the time elapsed since launch."""
+        if self.enabled:
+            self.phases.append((name, time.perf_counter() - self.started))
+
+    def report(self) -> str:
+        lines = ["Startup timings:"]
+        lines.extend(f"  {name:<28} {seconds * 1000:8.1f} ms" for name, seconds in self.phases)
+        return "\n".join(lines)
+
+
+startup_timer = StartupTimer(enabled=os.environ.get(STARTUP_TIMING_ENV) == "1")
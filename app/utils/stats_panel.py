@@ -0,0 +1,49 @@
+from rich.text import Text
+from textual.widgets import Static
+from app.utils.dbo import result_cache
+from app.utils.metrics import Metrics, metrics
+
+# Seconds between refreshes while the panel is shown
+STATS_REFRESH_INTERVAL = 1.0
+
+
+class StatsPanel(Static):
+    """Live table of operation timings and result cache hits. Hidden until toggled; refreshes only while shown."""
+
+    DEFAULT_CSS = """
+    StatsPanel {
+        display: none;
+        height: auto;
+        max-height: 20;
+        margin: 0 3;
+        padding: 0 1;
+        border: round $accent;
+        overflow-y: auto;
+    }
+    """
+
+    def __init__(self, source: Metrics = metrics, **kwargs):
+        super().__init__(**kwargs)
+        self.source = source
+        self.border_title = "Timings"
+        self._timer = None
+
+    def on_mount(self) -> None:
+        self._timer = self.set_interval(STATS_REFRESH_INTERVAL, self.refresh_stats, pause=True)
+
+    def toggle(self) -> None:
+        self.display = not self.display
+        if self.display:
+            self.refresh_stats()
+            self._timer.resume()
+        else:
+            self._timer.pause()
+
+    def refresh_stats(self) -> None:
+        report = self.source.report() if self.source.operations else "No operations timed yet."
+        cache = result_cache.stats()
+        report += (
+            f"\n\nResult cache: {cache['hits']} hits, {cache['misses']} misses ({cache['hit_rate']:.0%}), "
+            f"{cache['entries']} entries, {cache['bytes'] / 1024:.0f} KiB"
+        )
+        self.update(Text(report))
@@ -1,17 +1,182 @@
+from rich.style import Style
 from textual import events
+from textual.binding import Binding
+from textual.message import Message
 from textual.widgets import DataTable
+from textual.widgets.data_table import RowKey
+
+# Rows of scroll distance from the bottom at which more rows are requested
+NEAR_END_ROWS = 20
+
+# Seconds between column width updates while the table is being resized or filled
+RESIZE_THROTTLE = 0.05
+
+
+def allocate_widths(content_widths: list[int], available: int) -> list[int]:
+    """Split `available` cells between columns given the widest cell of each.
+
+    If everything fits, every column gets its content width and the spare
+    cells are shared out evenly. Otherwise narrow columns keep their content
+    width and the rest share what is left equally, so only the widest are truncated.
+    """
+    count = len(content_widths)
+    if count == 0:
+        return []
+    available = max(available, count)
+    spare = available - sum(content_widths)
+    if spare >= 0:
+        share, extra = divmod(spare, count)
+        return [width + share + (index < extra) for index, width in enumerate(content_widths)]
+
+    widths = [0] * count
+    remaining, left = available, count
+    for index in sorted(range(count), key=content_widths.__getitem__):
+        width = min(content_widths[index], remaining // left)
+        widths[index] = max(width, 1)
+        remaining -= widths[index]
+        left -= 1
+    # Cells lost to rounding go to the truncated columns, leftmost first
+    for index in range(count):
+        if remaining <= 0:
+            break
+        if widths[index] < content_widths[index]:
+            widths[index] += 1
+            remaining -= 1
+    return widths
+
 
 class StretchyDataTable(DataTable):
-    def on_resize(self, event: events.Resize) -> None:
-        total_width = event.size.width
-        if len(self.columns) == 0:
+    COMPONENT_CLASSES = DataTable.COMPONENT_CLASSES | {"datatable--selected"}
+
+    DEFAULT_CSS = """
+    StretchyDataTable > .datatable--selected {
+        background: $accent 40%;
+        text-style: bold;
+    }
+    """
+
+    BINDINGS = [
+        Binding("space", "toggle_selection", "Select row"),
+        Binding("escape", "clear_selection", "Clear selection", show=False),
+    ]
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # Row keys picked for a batch edit or delete, besides the cursor row
+        self.selected_keys: set[str] = set()
+        # Latest width to fit the columns to, applied at most once per RESIZE_THROTTLE
+        self._fit_width: int | None = None
+        self._fit_timer = None
+        self._fitted: tuple | None = None
+
+    class SelectionChanged(Message):
+        """Posted when rows are added to or removed from the multi-row selection."""
+
+        def __init__(self, data_table: "StretchyDataTable") -> None:
+            self.data_table = data_table
+            super().__init__()
+
+    class NearEnd(Message):
+        """Posted when the table is scrolled close to its last loaded row."""
+
+        def __init__(self, data_table: "StretchyDataTable") -> None:
+            self.data_table = data_table
+            super().__init__()
+
+    def watch_scroll_y(self, old_value: float, new_value: float) -> None:
+        super().watch_scroll_y(old_value, new_value)
+        if self.row_count and self.max_scroll_y - new_value <= NEAR_END_ROWS:
+            self.post_message(self.NearEnd(self))
+
+    def action_toggle_selection(self) -> None:
+        """Add the cursor row to the selection, or remove it if already selected."""
+        if self.row_count == 0:
             return
-        
-        total_padding = 2 * (self.cell_padding * len(self.columns))
-        column_width = (total_width - total_padding) // len(self.columns)
+        row_key = self.coordinate_to_cell_key(self.cursor_coordinate).row_key.value
+        if row_key in self.selected_keys:
+            self.selected_keys.discard(row_key)
+        else:
+            self.selected_keys.add(row_key)
+        self._selection_changed()
+
+    def action_clear_selection(self) -> None:
+        if self.selected_keys:
+            self.selected_keys.clear()
+            self._selection_changed()
+
+    def _selection_changed(self) -> None:
+        self._clear_caches()
+        self.refresh()
+        self.post_message(self.SelectionChanged(self))
 
+    def _get_row_style(self, row_index: int, base_style: Style) -> Style:
+        row_style = super()._get_row_style(row_index, base_style)
+        if row_index >= 0 and self.selected_keys:
+            row_key = self._row_locations.get_key(row_index)
+            if row_key is not None and row_key.value in self.selected_keys:
+                row_style += self.get_component_styles("datatable--selected").rich_style
+        return row_style
+
+    def remove_row(self, row_key: RowKey | str) -> None:
+        super().remove_row(row_key)
+        key = row_key.value if isinstance(row_key, RowKey) else row_key
+        if key in self.selected_keys:
+            self.selected_keys.discard(key)
+            self.post_message(self.SelectionChanged(self))
+
+    def clear(self, columns: bool = False) -> "StretchyDataTable":
+        if self.selected_keys:
+            self.selected_keys.clear()
+            self.post_message(self.SelectionChanged(self))
+        super().clear(columns)
+        # Start measuring the new rows from the header widths
         for column in self.columns.values():
+            column.content_width = column.label.cell_len
+        self._schedule_fit()
+        return self
+
+    def on_resize(self, event: events.Resize) -> None:
+        # Skip DataTable._on_resize: it bumps _update_count, which throws away the
+        # row order and y-offset caches (O(rows) to rebuild) on every event of a drag.
+        # Rendered lines are keyed by widget width, and _fit_columns drops the
+        # width-dependent caches itself.
+        event.prevent_default()
+        self._fit_width = event.size.width
+        self._schedule_fit()
+
+    def _update_dimensions(self, new_rows) -> None:
+        # DataTable keeps column.content_width as the running max of the cells it has
+        # measured, so only new rows are measured; refit if that changed a column.
+        super()._update_dimensions(new_rows)
+        if self._fitted is not None and self._fitted[1] != self._content_widths():
+            self._schedule_fit()
+
+    def _content_widths(self) -> tuple[int, ...]:
+        return tuple(column.content_width for column in self.ordered_columns)
+
+    def _schedule_fit(self) -> None:
+        """Coalesce resize and content changes into one width update per RESIZE_THROTTLE."""
+        if self._fit_width is not None and self._fit_timer is None:
+            self._fit_timer = self.set_timer(RESIZE_THROTTLE, self._fit_columns)
+
+    def _fit_columns(self) -> None:
+        self._fit_timer = None
+        columns = self.ordered_columns
+        if not columns or self._fit_width is None:
+            return
+        content_widths = self._content_widths()
+        if self._fitted == (self._fit_width, content_widths):
+            return
+        self._fitted = (self._fit_width, content_widths)
+
+        available = self._fit_width - 2 * self.cell_padding * len(columns)
+        for column, width in zip(columns, allocate_widths(list(content_widths), available)):
             column.auto_width = False
-            column.width = column_width
-        
+            column.width = width
+        # Cached cell and row renders and the virtual size depend on the column widths
+        self._cell_render_cache.clear()
+        self._row_render_cache.clear()
+        self._line_cache.clear()
+        self._styles_cache.clear()
+        self._require_update_dimensions = True
         self.refresh()
@@ -0,0 +1,29 @@
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+
+@dataclass(frozen=True, slots=True)
+class UserRow:
+    """Read-only search result with the columns of a usersv2 row.
+
+    Unlike a User it carries no SQLAlchemy instrumentation or session state,
+    so it stays valid after the session closes and costs a fraction of the memory.
+    Field order matches dbo.RESULT_COLUMNS.
+    """
+
+    id: int
+    username: str
+    password: str
+    uid: str | None
+    level: int | None
+    rank: str
+    rank_value: int
+
+    @classmethod
+    def from_user(cls, user: Any) -> "UserRow":
+        return cls(user.id, user.username, user.password, user.uid, user.level, user.rank, user.rank_value)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple]) -> list["UserRow"]:
+        """Build results from tuples in RESULT_COLUMNS order."""
+        return [cls(*row) for row in rows]
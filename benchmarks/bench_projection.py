@@ -0,0 +1,58 @@
+"""Compare hydrating User instances against the plain-row projection for rank searches.
+
+Times User.get_users_by_ranks against User.get_rows_by_ranks on the SQL
+path (the in-memory rank index is not loaded and the result cache is off,
+so every repeat queries) for a wide rank window that returns a large share
+of the table.
+
+Usage: python -m benchmarks.bench_projection [--sizes 10000 100000] [--repeat 3]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from sqlmodel import Session
+from app.utils.dbo import User, create_db_engine, init_db, result_cache
+from app.utils.rank_utils import RANK_MAP, get_valid_ranks
+from benchmarks.bench_username_search import seed
+
+WINDOW = list(get_valid_ranks(RANK_MAP["Gold 1"]))
+
+
+def time_search(engine, search, repeat: int) -> tuple[float, int]:
+    """Return the mean time in milliseconds of one full search and its row count."""
+    elapsed = 0.0
+    for _ in range(repeat):
+        # A fresh session each time so the identity map starts empty
+        with Session(engine) as session:
+            start = time.perf_counter()
+            rows = search(session, WINDOW)
+            elapsed += time.perf_counter() - start
+    return elapsed * 1000 / repeat, len(rows)
+
+
+def run(rows: int, repeat: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(os.path.join(tmp, "bench.db"))
+        init_db(engine)
+        seed(engine, rows, spread_ranks=True)
+        orm_ms, count = time_search(engine, User.get_users_by_ranks, repeat)
+        rows_ms, _ = time_search(engine, User.get_rows_by_ranks, repeat)
+        engine.dispose()
+    print(f"{rows:>9} rows | {count:>8} results | User {orm_ms:9.1f} ms | rows {rows_ms:9.1f} ms | x{orm_ms / rows_ms:5.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    # Repeats after the first would otherwise be cache hits for get_rows_by_ranks
+    result_cache.enabled = False
+    for rows in args.sizes:
+        run(rows, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
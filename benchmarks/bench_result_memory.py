@@ -0,0 +1,51 @@
+"""Measure the memory held by a large search result as User instances and as UserRow.
+
+Uses tracemalloc to record the memory still allocated once the result list
+is built (retained) and the high-water mark while building it (peak).
+
+Usage: python -m benchmarks.bench_result_memory [--rows 100000]
+"""
+import argparse
+import gc
+import os
+import tempfile
+import tracemalloc
+
+from sqlmodel import Session
+from app.utils.dbo import User, create_db_engine, init_db, result_cache
+from benchmarks.bench_username_search import seed
+
+ALL_RANKS = list(range(21))
+
+
+def measure(engine, search) -> tuple[int, float, float]:
+    """Return the result size and the retained and peak memory in MiB."""
+    gc.collect()
+    with Session(engine) as session:
+        tracemalloc.start()
+        rows = search(session, ALL_RANKS)
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        count = len(rows)
+    return count, retained / 2**20, peak / 2**20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+    # Keep get_rows_by_ranks from copying its result into the result cache while traced
+    result_cache.enabled = False
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(os.path.join(tmp, "bench.db"))
+        init_db(engine)
+        seed(engine, args.rows, spread_ranks=True)
+        for name, search in (("User", User.get_users_by_ranks), ("UserRow", User.get_rows_by_ranks)):
+            count, retained, peak = measure(engine, search)
+            print(f"{name:>8} | {count:>8} results | retained {retained:8.1f} MiB | peak {peak:8.1f} MiB")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Compare write and read latency of the SQLite storage profiles.
+
+For each profile in app.utils.config.SQLITE_PROFILES this seeds a fresh
+database, then times User.create_user (one commit per call) and
+User.get_users_by_ranks on the SQL path.
+
+Usage: python -m benchmarks.bench_sqlite_profile [--rows 20000] [--writes 500] [--reads 200]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from sqlmodel import Session
+from app.utils.config import SQLITE_PROFILES
+from app.utils.dbo import User, create_db_engine, init_db
+from benchmarks.bench_username_search import seed
+
+
+def run(profile: str, rows: int, writes: int, reads: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(os.path.join(tmp, "bench.db"), profile=profile)
+        init_db(engine)
+        seed(engine, rows)
+
+        with Session(engine) as session:
+            start = time.perf_counter()
+            for i in range(writes):
+                User.create_user(session, f"bench_write_{i}", "pass", "Gold 1", 8, uid=f"bench_uid_{i}")
+            write_ms = (time.perf_counter() - start) * 1000 / writes
+
+            start = time.perf_counter()
+            for i in range(reads):
+                User.get_users_by_ranks(session, [i % 21, (i + 1) % 21, (i + 2) % 21])
+            read_ms = (time.perf_counter() - start) * 1000 / reads
+        engine.dispose()
+
+    print(f"{profile:>8} | create_user {write_ms:8.3f} ms | get_users_by_ranks {read_ms:8.3f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--writes", type=int, default=500)
+    parser.add_argument("--reads", type=int, default=200)
+    args = parser.parse_args()
+    for profile in SQLITE_PROFILES:
+        run(profile, args.rows, args.writes, args.reads)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Measure results-table latency of one edit: full rebuild vs row-level delta.
+
+Runs the TUI headless with a populated results table and times, per edit,
+the old clear-and-re-add repaint against RivalsSmurfTracker.apply_user_change.
+
+Usage: python -m benchmarks.bench_table_edit [--sizes 1000 10000 50000]
+"""
+import argparse
+import asyncio
+import time
+
+from textual.widgets import DataTable
+from app.rivals_viewer import RivalsSmurfTracker
+from app.utils.dbo import User
+from app.utils.result_pager import ResultPager
+
+
+def make_users(rows: int) -> list[User]:
+    return [
+        User(id=i, username=f"user{i}", password="pass", uid=f"uid{i}", level=i % 100, rank="Gold 1", rank_value=8)
+        for i in range(1, rows + 1)
+    ]
+
+
+async def run(rows: int, edits: int) -> None:
+    users = make_users(rows)
+    app = RivalsSmurfTracker(incremental_search=False)
+    async with app.run_test() as pilot:
+        table = app.query_one(DataTable)
+        app._pager = ResultPager(lambda session, after_id, limit: [], matches=lambda user: "user" in user.username)
+        app._pager.exhausted = True
+        app.add_result_rows(users)
+        await pilot.pause()
+
+        start = time.perf_counter()
+        for i in range(edits):
+            users[i].level = -i
+            table.clear()
+            app.add_result_rows(users)
+            await pilot.pause()
+        rebuild_ms = (time.perf_counter() - start) * 1000 / edits
+
+        start = time.perf_counter()
+        for i in range(edits):
+            users[i].level = i
+            app.apply_user_change(users[i].id, users[i])
+            await pilot.pause()
+        delta_ms = (time.perf_counter() - start) * 1000 / edits
+
+    print(f"{rows:>7} rows | rebuild {rebuild_ms:10.3f} ms/edit | delta {delta_ms:8.3f} ms/edit")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--edits", type=int, default=5)
+    args = parser.parse_args()
+    for rows in args.sizes:
+        asyncio.run(run(rows, args.edits))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Measure a window-drag resize storm on a large results table.
+
+Runs a minimal app headless with `--rows` rows in a StretchyDataTable and
+posts `--events` terminal resizes, one every `--interval` seconds, like a
+window being dragged. Compares the old handler, which re-split the width and
+refreshed on every event, against the throttled, content-aware one. Reports
+CPU time for the storm plus settling, and how many times column widths were set.
+
+Usage: python -m benchmarks.bench_table_resize [--rows 10000] [--events 200] [--interval 0.005]
+"""
+import argparse
+import asyncio
+import time
+
+from textual import events
+from textual.app import App, ComposeResult
+from textual.drivers.headless_driver import HeadlessDriver
+from textual.geometry import Size
+from app.utils.stretchy_datatable import StretchyDataTable
+
+
+class EagerResizeTable(StretchyDataTable):
+    """The previous behaviour: equal widths and a full refresh on every resize event."""
+
+    width_updates = 0
+
+    def on_resize(self, event: events.Resize) -> None:
+        if len(self.columns) == 0:
+            return
+        type(self).width_updates += 1
+        total_padding = 2 * (self.cell_padding * len(self.columns))
+        column_width = (event.size.width - total_padding) // len(self.columns)
+        for column in self.columns.values():
+            column.auto_width = False
+            column.width = column_width
+        self.refresh()
+
+
+class CountingTable(StretchyDataTable):
+    width_updates = 0
+
+    def _fit_columns(self) -> None:
+        fitted = self._fitted
+        super()._fit_columns()
+        if self._fitted != fitted:
+            type(self).width_updates += 1
+
+
+class TableApp(App):
+    def __init__(self, table_class: type[StretchyDataTable], rows: int):
+        super().__init__()
+        self.table_class = table_class
+        self.rows = rows
+
+    def compose(self) -> ComposeResult:
+        yield self.table_class(cursor_type="row")
+
+    def on_mount(self) -> None:
+        table = self.query_one(StretchyDataTable)
+        for key in ("username", "password", "uid", "level", "rank"):
+            table.add_column(key.title(), width=25, key=key)
+        for i in range(self.rows):
+            table.add_row(f"user_{i}", "password", f"{i:09d}", i % 500, "Gold 1", key=str(i))
+
+
+async def run(table_class: type[StretchyDataTable], rows: int, resize_events: int, interval: float) -> tuple[float, int]:
+    app = TableApp(table_class, rows)
+    async with app.run_test(size=(120, 40)) as pilot:
+        await pilot.pause()
+        table_class.width_updates = 0
+        start = time.process_time()
+        for i in range(resize_events):
+            # Sweep between 80 and 200 columns and back
+            size = Size(80 + abs(i % 240 - 120), 40)
+            if isinstance(app._driver, HeadlessDriver):
+                app._driver._size = size
+            app.post_message(events.Resize(size, size))
+            await asyncio.sleep(interval)
+        await pilot.pause(0.2)
+        elapsed = time.process_time() - start
+    return elapsed, table_class.width_updates
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--interval", type=float, default=0.005)
+    args = parser.parse_args()
+    for label, table_class in (("every event", EagerResizeTable), ("throttled", CountingTable)):
+        cpu, updates = asyncio.run(run(table_class, args.rows, args.events, args.interval))
+        print(f"{args.rows:>7} rows | {label:<12} | {cpu * 1000:9.1f} ms CPU | {updates:>4} width updates for {args.events} resizes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Compare the FTS5 trigram username search against the ILIKE table scan.
+
+Usage: python -m benchmarks.bench_username_search [--sizes 10000 100000 1000000]
+"""
+import argparse
+import os
+import random
+import string
+import tempfile
+import time
+
+from sqlmodel import SQLModel, Session, create_engine
+from app.utils.dbo import User
+from app.utils.rank_utils import RANKS
+
+QUERIES = ["abc", "smurf", "xq7", "main_12", "zzzzzz"]
+
+
+def seed(engine, rows: int, spread_ranks: bool = False) -> None:
+    """Insert `rows` synthetic accounts through a raw executemany.
+
+    With spread_ranks the accounts get random ranks instead of all sharing one.
+    """
+    rng = random.Random(rows)
+    alphabet = string.ascii_letters + string.digits + "_"
+    data = []
+    for i in range(rows):
+        rank_value = rng.randrange(len(RANKS)) if spread_ranks else 12
+        rank = RANKS[len(RANKS) - 1 - rank_value]
+        data.append(("".join(rng.choices(alphabet, k=rng.randint(6, 16))) + f"_{i}", "pass", rank, rank_value))
+    connection = engine.raw_connection()
+    try:
+        connection.cursor().executemany(
+            "INSERT INTO usersv2 (username, password, rank, rank_value) VALUES (?, ?, ?, ?)", data
+        )
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def time_queries(engine, use_search_index: bool, repeat: int) -> float:
+    """Return the mean time in milliseconds of one username search."""
+    with Session(engine) as session:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for query in QUERIES:
+                User.get_users_by_username(session, query, use_search_index=use_search_index)
+        elapsed = time.perf_counter() - start
+    return elapsed * 1000 / (repeat * len(QUERIES))
+
+
+def run(rows: int, repeat: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        SQLModel.metadata.create_all(engine)
+        seed(engine, rows)
+        ilike_ms = time_queries(engine, use_search_index=False, repeat=repeat)
+        fts_ms = time_queries(engine, use_search_index=True, repeat=repeat)
+        engine.dispose()
+    print(f"{rows:>9} rows | ilike {ilike_ms:9.3f} ms | trigram {fts_ms:9.3f} ms | x{ilike_ms / fts_ms:7.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    for rows in args.sizes:
+        run(rows, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
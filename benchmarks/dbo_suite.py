@@ -0,0 +1,191 @@
+"""Latency and throughput of the User data-access methods at several table sizes.
+
+For each size a temp database is migrated and seeded with synthetic accounts,
+then every operation is called `--iterations` times. Results are written as
+JSON with throughput and p50/p99 latency per operation. Searches fetch one
+results page (PAGE_SIZE rows) the way the TUI does, and the in-memory rank
+index is not loaded, so get_users_by_ranks measures the SQL path.
+
+Usage:
+    python -m benchmarks.dbo_suite run [--sizes 1000 100000 1000000] [--iterations 200] [--output run.json]
+    python -m benchmarks.dbo_suite compare baseline.json candidate.json [--threshold 0.25]
+
+compare exits with status 1 if any operation's p50 or p99 latency got worse
+by more than the threshold. p99 needs a few hundred iterations to be stable.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable
+
+from sqlmodel import Session
+from app.utils.dbo import User, create_db_engine, init_db
+from app.utils.rank_utils import RANK_MAP, RANKS, get_valid_ranks
+from app.utils.result_pager import PAGE_SIZE
+from benchmarks.synthetic import ALPHABET, generate_accounts, seed_database
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+OPERATIONS = ("create_user", "does_user_exists", "get_users_by_username", "get_users_by_ranks", "update_user", "delete_user")
+COMPARED_METRICS = ("p50_ms", "p99_ms")
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies_ns: list[int]) -> dict:
+    latencies = sorted(ns / 1e6 for ns in latencies_ns)
+    total_s = sum(latencies) / 1000
+    return {
+        "calls": len(latencies),
+        "ops_per_sec": len(latencies) / total_s if total_s else 0.0,
+        "p50_ms": percentile(latencies, 0.50),
+        "p99_ms": percentile(latencies, 0.99),
+        "max_ms": latencies[-1],
+    }
+
+
+def timed(calls: list[Callable[[], object]]) -> list[int]:
+    latencies = []
+    for call in calls:
+        start = time.perf_counter_ns()
+        call()
+        latencies.append(time.perf_counter_ns() - start)
+    return latencies
+
+
+def bench_size(rows: int, iterations: int, seed: int = 0) -> dict:
+    """Seed a database with `rows` accounts and time each operation."""
+    rng = random.Random(seed)
+    # The same generator and seed reproduce the seeded usernames without holding them all
+    sample_rows = set(rng.sample(range(rows), min(iterations, rows)))
+    existing = [account for i, account in enumerate(generate_accounts(rows, seed)) if i in sample_rows]
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(os.path.join(tmp, "bench.db"))
+        init_db(engine)
+        seed_database(engine, rows, seed)
+
+        with Session(engine) as session:
+            new_accounts = [(f"bench_new_{i}", "pass", "Gold 1", RANK_MAP["Gold 1"], f"bench_uid_{i}") for i in range(iterations)]
+            results["create_user"] = timed([
+                lambda a=a: User.create_user(session, a[0], a[1], a[2], a[3], uid=a[4]) for a in new_accounts
+            ])
+
+            results["does_user_exists"] = timed([
+                lambda a=existing[i % len(existing)]: User.does_user_exists(session, username=a[0]) for i in range(iterations)
+            ])
+
+            queries = ["".join(rng.choices(ALPHABET, k=rng.randint(3, 5))) for _ in range(iterations)]
+            results["get_users_by_username"] = timed([
+                lambda q=q: User.get_users_by_username(session, q, limit=PAGE_SIZE) for q in queries
+            ])
+
+            windows = [list(get_valid_ranks(rng.randrange(len(RANKS)))) for _ in range(iterations)]
+            results["get_users_by_ranks"] = timed([
+                lambda w=w: User.get_users_by_ranks(session, w, limit=PAGE_SIZE) for w in windows
+            ])
+
+            created = [User.get_user_by_username(session, a[0], a[4]) for a in new_accounts]
+            results["update_user"] = timed([
+                lambda u=u: u.update_user(session, u.username, "new_pass", "Gold 2", RANK_MAP["Gold 2"], uid=u.uid) for u in created
+            ])
+
+            results["delete_user"] = timed([
+                lambda u=u: User.delete_user(session, u.username, "new_pass", "Gold 2", RANK_MAP["Gold 2"], uid=u.uid) for u in created
+            ])
+        engine.dispose()
+
+    return {operation: summarize(results[operation]) for operation in OPERATIONS}
+
+
+def run(sizes: list[int], iterations: int) -> dict:
+    report = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "iterations": iterations,
+        },
+        "results": {},
+    }
+    for rows in sizes:
+        print(f"Benchmarking {rows} rows...", file=sys.stderr)
+        report["results"][str(rows)] = bench_size(rows, iterations)
+    return report
+
+
+def compare(baseline: dict, candidate: dict, threshold: float) -> list[dict]:
+    """Return one entry per size, operation and metric present in both runs, flagged if it regressed."""
+    rows = []
+    for size, operations in candidate["results"].items():
+        for operation, stats in operations.items():
+            before = baseline["results"].get(size, {}).get(operation)
+            if before is None:
+                continue
+            for metric in COMPARED_METRICS:
+                change = stats[metric] / before[metric] - 1 if before[metric] else 0.0
+                rows.append({
+                    "size": size, "operation": operation, "metric": metric,
+                    "baseline": before[metric], "candidate": stats[metric],
+                    "change": change, "regression": change > threshold,
+                })
+    return rows
+
+
+def print_report(report: dict) -> None:
+    for size, operations in report["results"].items():
+        print(f"{size} rows")
+        for operation, stats in operations.items():
+            print(f"  {operation:<24} {stats['ops_per_sec']:>10.0f} ops/s  p50 {stats['p50_ms']:8.3f} ms  p99 {stats['p99_ms']:8.3f} ms")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="Run the benchmarks and write a JSON report.")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    run_parser.add_argument("--iterations", type=int, default=200)
+    run_parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+    compare_parser = commands.add_parser("compare", help="Compare two JSON reports.")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    compare_parser.add_argument("--threshold", type=float, default=0.25, help="Allowed relative slowdown, 0.25 is 25%%.")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        report = run(args.sizes, args.iterations)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as stream:
+                json.dump(report, stream, indent=2)
+            print_report(report)
+        else:
+            json.dump(report, sys.stdout, indent=2)
+            print()
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as stream:
+        baseline = json.load(stream)
+    with open(args.candidate, encoding="utf-8") as stream:
+        candidate = json.load(stream)
+    rows = compare(baseline, candidate, args.threshold)
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ""
+        print(f"{row['size']:>8} {row['operation']:<24} {row['metric']:<7} "
+              f"{row['baseline']:9.3f} -> {row['candidate']:9.3f} ms ({row['change']:+7.1%}) {flag}".rstrip())
+    return 1 if any(row["regression"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,11 @@
-from app.rivals_viewer import main_run
+import sys
+from app.utils.startup_timer import startup_timer
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        from app.cli import main
+        sys.exit(main())
+
+    with startup_timer.phase("imports"):
+        from app.rivals_viewer import main_run
     main_run()
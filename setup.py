@@ -3,7 +3,7 @@ from cx_Freeze import setup, Executable
 # Dependencies are automatically detected, but it might need
 # fine tuning.
 includes = ["app"]
-packages = ["sqlmodel", "sqlalchemy","textual", "textual._tree_sitter"]
+packages = ["sqlmodel", "sqlalchemy","textual", "textual._tree_sitter", "aiosqlite", "greenlet"]
 excludes = ["pytest", "cx_Freeze", "textual-dev", "textual-serve", "aiohttp", "click", "msgpack", "colorana", "iniconfig", "packaging", "pluggy", "cx-logging", "dmgbuild","filelock", "lief", "patchelf"]
 zip_include_packages: list[str] = []
 build_options = {'packages': packages, 'excludes': excludes, 'includes': includes, 'zip_include_packages': zip_include_packages}
@@ -0,0 +1,19 @@
+import pytest
+from sqlmodel import SQLModel, create_engine
+
+
+@pytest.fixture
+def in_memory_db():
+    """Create an in-memory database for testing with SQLModel."""
+    engine = create_engine("sqlite:///:memory:")
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def file_db(tmp_path):
+    """Create a database file for tests that open it from another connection or process."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'users.db'}")
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
@@ -0,0 +1,60 @@
+import asyncio
+import pytest
+from app.utils.async_dbo import AsyncUser, async_session, create_async_db_engine
+from app.utils.dbo import User, create_db_engine, init_db
+from app.utils.result_pager import ResultPager
+from app.utils.User_Error import UserError
+
+
+@pytest.fixture
+def async_db(tmp_path):
+    """Create a migrated database file and an aiosqlite engine for it."""
+    path = str(tmp_path / "users.db")
+    sync_engine = create_db_engine(path)
+    init_db(sync_engine)
+    sync_engine.dispose()
+    return create_async_db_engine(path)
+
+def test_async_user_round_trip(async_db):
+    """Test that AsyncUser creates, searches, updates and deletes through the async engine."""
+    async def run():
+        try:
+            async with async_session(async_db) as session:
+                user = await AsyncUser.create_user(session, "test_user", "pass", "Gold 1", 8, uid="test_uid")
+            async with async_session(async_db) as session:
+                with pytest.raises(UserError):
+                    await AsyncUser.create_user(session, "TEST_USER", "pass", "Gold 1", 8)
+            async with async_session(async_db) as session:
+                assert [r.username for r in await AsyncUser.get_rows_by_username(session, "user")] == ["test_user"]
+                updated = await AsyncUser.update_user_by_id(session, user.id, "renamed", "pass", "Gold 2", 7)
+                assert updated.username == "renamed"
+            async with async_session(async_db) as session:
+                assert [r.username for r in await AsyncUser.get_rows_by_ranks(session, [7])] == ["renamed"]
+                assert await AsyncUser.delete_user_by_id(session, user.id) is True
+                assert await AsyncUser.get_rows_by_ranks(session, [7]) == []
+        finally:
+            await async_db.dispose()
+    asyncio.run(run())
+
+def test_async_searches_overlap(async_db):
+    """Test that searches on separate sessions run concurrently and page through ResultPager."""
+    async def run():
+        try:
+            async with async_session(async_db) as session:
+                for i in range(5):
+                    await AsyncUser.create_user(session, f"test_user{i}", "pass", "Gold 1", 8)
+
+            async def search(query):
+                async with async_session(async_db) as session:
+                    return await AsyncUser.get_rows_by_username(session, query)
+            results = await asyncio.gather(search("user1"), search("user3"), search("nobody"))
+            assert [[r.username for r in rows] for rows in results] == [["test_user1"], ["test_user3"], []]
+
+            pager = ResultPager(lambda s, after_id, limit: User.get_rows_by_ranks(s, [8], after_id=after_id, limit=limit), page_size=2)
+            async with async_session(async_db) as session:
+                pages = [await pager.next_page_async(session) for _ in range(3)]
+            assert [len(page) for page in pages] == [2, 2, 1]
+            assert pager.exhausted
+        finally:
+            await async_db.dispose()
+    asyncio.run(run())
@@ -0,0 +1,50 @@
+import csv
+import json
+import pytest
+from sqlmodel import Session
+from app.utils.bulk_export import EXPORT_COLUMNS, export_users
+from app.utils.dbo import User
+from app.utils.User_Error import UserError
+
+
+@pytest.fixture
+def populated_db(in_memory_db):
+    with Session(in_memory_db) as session:
+        User.create_user(session, "test_user1", "pass1", "Gold 1", 8, uid="uid1", level=3)
+        User.create_user(session, "test_user2", "pass2", "Diamond 1", 14)
+        User.create_user(session, "other", "pass3", "Silver 1", 6)
+    return in_memory_db
+
+def test_export_csv(populated_db, tmp_path):
+    """Test that every row is streamed to CSV in id order."""
+    path = tmp_path / "accounts.csv"
+    with Session(populated_db) as session:
+        assert export_users(session, str(path), "csv") == 3
+
+    with open(path, newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == list(EXPORT_COLUMNS)
+    assert rows[1] == ["1", "test_user1", "pass1", "uid1", "3", "Gold 1", "8"]
+    assert [row[1] for row in rows[1:]] == ["test_user1", "test_user2", "other"]
+
+def test_export_jsonl_filters(populated_db, tmp_path):
+    """Test that rank and username filters reuse the search logic."""
+    path = tmp_path / "accounts.jsonl"
+    with Session(populated_db) as session:
+        assert export_users(session, str(path), "jsonl", rank="gold 2", search_query="test") == 1
+        with pytest.raises(UserError):
+            export_users(session, str(path), "jsonl", rank="Tin 1")
+
+    rows = [json.loads(line) for line in path.read_text().splitlines()]
+    assert rows == [{"id": 1, "username": "test_user1", "password": "pass1", "uid": "uid1", "level": 3, "rank": "Gold 1", "rank_value": 8}]
+
+def test_export_parquet(populated_db, tmp_path):
+    """Test that the columnar export writes every row."""
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "accounts.parquet"
+    with Session(populated_db) as session:
+        assert export_users(session, str(path), "parquet") == 3
+
+    table = pq.read_table(path)
+    assert table.column_names == list(EXPORT_COLUMNS)
+    assert table.column("username").to_pylist() == ["test_user1", "test_user2", "other"]
@@ -0,0 +1,69 @@
+import json
+import pytest
+from sqlmodel import Session, select
+from app.utils.bulk_import import import_users, read_csv, read_jsonl
+from app.utils.dbo import User
+
+
+def test_import_users(in_memory_db):
+    """Test that import_users inserts valid rows across batches and reports conflicts."""
+    with Session(in_memory_db) as session:
+        User.create_user(session, "existing", "pass", "Gold 1", 12, uid="uid0")
+
+        rows = [
+            {"username": "test_user1", "password": "pass1", "rank": "Gold 1", "uid": "uid1", "level": "5"},
+            {"username": "EXISTING", "password": "pass2", "rank": "Gold 2"},
+            {"username": "test_user3", "password": "pass3", "rank": "Silver 1", "uid": "uid0"},
+            {"username": "test_user4", "password": "pass4", "rank": "Gold 1", "uid": "uid1"},
+            {"username": "test_user5", "password": "", "rank": "Gold 1"},
+            {"username": "test_user6", "password": "pass6", "rank": "Tin 1"},
+            {"username": "Test_User1", "password": "pass7", "rank": "Gold 1"},
+            {"username": "test_user8", "password": "pass8", "rank": "Bronze 3", "level": 2},
+        ]
+        report = import_users(session, rows, batch_size=3)
+
+        assert report.imported == 2
+        assert sorted((c.line, c.reason) for c in report.conflicts) == [
+            (2, "username already exists"),
+            (3, "uid already exists"),
+            (4, "uid already exists"),
+            (5, "username, password and rank are required"),
+            (6, "unknown rank 'Tin 1'"),
+            (7, "username already exists"),
+        ]
+
+        users = session.exec(select(User).order_by(User.id)).all()
+        assert [(u.username, u.uid, u.level, u.rank_value) for u in users] == [
+            ("existing", "uid0", None, 12),
+            ("test_user1", "uid1", 5, 8),
+            ("test_user8", None, 2, 0),
+        ]
+
+def test_read_import_files(tmp_path):
+    """Test that the CSV reader yields one dict per account and the JSONL reader one line per account."""
+    csv_path = tmp_path / "accounts.csv"
+    csv_path.write_text("username,password,rank,uid,level\ntest_user,pass,Gold 1,uid1,3\n")
+    jsonl_path = tmp_path / "accounts.jsonl"
+    jsonl_path.write_text(json.dumps({"username": "test_user", "password": "pass", "rank": "Gold 1"}) + "\n\n")
+
+    assert list(read_csv(str(csv_path))) == [{"username": "test_user", "password": "pass", "rank": "Gold 1", "uid": "uid1", "level": "3"}]
+    assert [json.loads(line) for line in read_jsonl(str(jsonl_path))] == [{"username": "test_user", "password": "pass", "rank": "Gold 1"}]
+
+def test_import_malformed_jsonl(in_memory_db, tmp_path):
+    """Test that malformed or non-object JSONL lines are reported as conflicts without losing the rest of the batch."""
+    jsonl_path = tmp_path / "accounts.jsonl"
+    jsonl_path.write_text("\n".join([
+        json.dumps({"username": "test_user1", "password": "pass1", "rank": "Gold 1"}),
+        "{not json",
+        "[1, 2]",
+        json.dumps({"username": 5, "password": "pass4", "rank": "Gold 1"}),
+        json.dumps({"username": "test_user5", "password": "pass5", "rank": "Gold 2"}),
+    ]) + "\n")
+
+    with Session(in_memory_db) as session:
+        report = import_users(session, read_jsonl(str(jsonl_path)), batch_size=10)
+
+        assert report.imported == 2
+        assert [(c.line, c.username) for c in report.conflicts] == [(2, None), (3, None), (4, 5)]
+        assert report.conflicts[1].reason == "row is not a JSON object"
+        assert session.exec(select(User.username).order_by(User.id)).all() == ["test_user1", "test_user5"]
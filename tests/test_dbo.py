@@ -1,7 +1,9 @@
 import pytest
-from sqlmodel import SQLModel, Session, create_engine, select, and_
-from app.utils.dbo import User, init_db, schema_migration, _table_exists
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, create_engine, select, and_
+from app.utils.dbo import User, init_db, result_cache, schema_migration, _table_exists
 from app.utils.User_Error import UserError
+from app.utils.user_row import UserRow
 from sqlite3 import connect
 import logging
 
@@ -60,14 +62,6 @@ def test_init_db_invalid_connection(caplog):
             pass
         assert "Error initializing database" in caplog.text
 
-@pytest.fixture
-def in_memory_db():
-    """Create an in-memory database for testing with SQLModel."""
-    engine = create_engine("sqlite:///:memory:")
-    SQLModel.metadata.create_all(engine)
-    yield engine
-    engine.dispose()
-
 # create_user test group
 def test_create_user(in_memory_db):
     """Test if User.create correctly inserts data into the in-memory database."""
@@ -354,6 +348,30 @@ def test_update_user_exception_handling(in_memory_db):
         with pytest.raises(Exception):
             user.update_user(session, None, "new_pass", "Silver 2", 5, uid="new_uid", level=40)
 
+@pytest.fixture
+def case_duplicates_db(in_memory_db):
+    """An in-memory database holding "Alice" and "alice", as migration 3 keeps them with a non-unique NOCASE index."""
+    with in_memory_db.begin() as connection:
+        connection.exec_driver_sql("DROP INDEX ix_usersv2_username_nocase")
+        connection.exec_driver_sql("CREATE INDEX ix_usersv2_username_nocase ON usersv2 (username COLLATE NOCASE)")
+    with Session(in_memory_db) as session:
+        User.create_user(session, "Alice", "pass1", "Gold 1", 8, uid="uid1")
+        session.add(User(username="alice", password="pass2", rank="Gold 1", rank_value=8, uid="uid2"))
+        session.add(User(username="bob", password="pass3", rank="Gold 1", rank_value=8, uid="uid3"))
+        session.commit()
+    return in_memory_db
+
+def test_update_user_keeps_case_duplicate_username(case_duplicates_db):
+    """Test that a case-only duplicate can be saved without renaming, but not renamed onto another user."""
+    with Session(case_duplicates_db) as session:
+        user = User.get_user_by_username(session, "Alice", "uid1")
+        user.update_user(session, "Alice", "new_pass", "Gold 2", 7, uid="uid1")
+        assert user.password == "new_pass"
+        with pytest.raises(UserError, match="username already exists"):
+            user.update_user(session, "BOB", "new_pass", "Gold 2", 7, uid="uid1")
+        with pytest.raises(UserError, match="UID already exists"):
+            user.update_user(session, "Alice", "new_pass", "Gold 2", 7, uid="uid2")
+
 # delete_user test group
 def test_delete_user(in_memory_db):
     """Test if User.delete_user correctly removes a user from database."""
@@ -395,3 +413,232 @@ def test_empty_database_retrieval(in_memory_db):
 
         users_by_ranks = User.get_users_by_ranks(session, [1, 2, 3])
         assert users_by_ranks == []
+
+def test_get_users_by_username_search_index(in_memory_db):
+    """Test that the trigram index returns the same matches as the ILIKE scan and tracks writes."""
+    with Session(in_memory_db) as session:
+        User.create_user(session, "MainAccount", "pass1", "Gold 1", 12)
+        User.create_user(session, "smurf_main", "pass2", "Silver 3", 6)
+        User.create_user(session, "other", "pass3", "Gold 2", 13)
+
+        for query in ["main", "MAIN", "ma", "account", "nothing", ""]:
+            indexed = [u.username for u in User.get_users_by_username(session, query)]
+            scanned = [u.username for u in User.get_users_by_username(session, query, use_search_index=False)]
+            assert indexed == scanned
+
+        user = User.get_user_by_username(session, "MainAccount")
+        user.update_user(session, "renamed", "pass1", "Gold 1", 12)
+        assert [u.username for u in User.get_users_by_username(session, "main")] == ["smurf_main"]
+
+        User.delete_user(session, "smurf_main", "pass2", "Silver 3", 6)
+        assert User.get_users_by_username(session, "main") == []
+        assert [u.username for u in User.get_users_by_username(session, "renam")] == ["renamed"]
+
+def test_search_keyset_pages(in_memory_db):
+    """Test that rank and username searches can be fetched in keyset pages ordered by id."""
+    with Session(in_memory_db) as session:
+        for i in range(7):
+            User.create_user(session, f"test_user{i}", "pass", "Gold 1", 10 + i % 2)
+
+        page1 = User.get_users_by_ranks(session, [10, 11], limit=3)
+        page2 = User.get_users_by_ranks(session, [10, 11], after_id=page1[-1].id, limit=3)
+        page3 = User.get_users_by_ranks(session, [10, 11], after_id=page2[-1].id, limit=3)
+        assert [u.username for u in page1 + page2 + page3] == [f"test_user{i}" for i in range(7)]
+        assert len(page3) == 1
+
+        page1 = User.get_users_by_username(session, "user", limit=4)
+        page2 = User.get_users_by_username(session, "user", after_id=page1[-1].id, limit=4)
+        assert [u.username for u in page1 + page2] == [f"test_user{i}" for i in range(7)]
+
+def test_init_db_skips_when_schema_current(tmp_path, caplog):
+    """Test that init_db stores the schema version and skips migration on later launches."""
+    from app.utils.dbo import SCHEMA_VERSION
+    engine = create_engine(f"sqlite:///{tmp_path / 'users.db'}")
+    with caplog.at_level(logging.INFO):
+        init_db(engine=engine)
+        assert "Old users table does not exist" in caplog.text
+        with engine.connect() as connection:
+            assert connection.exec_driver_sql("PRAGMA user_version").scalar() == SCHEMA_VERSION
+
+        caplog.clear()
+        init_db(engine=engine)
+        assert "skipping migration" in caplog.text
+        assert "Old users table does not exist" not in caplog.text
+        assert "Database initialized successfully" in caplog.text
+    engine.dispose()
+
+def test_create_db_engine_profiles(tmp_path):
+    """Test that create_db_engine applies the storage profile to new connections."""
+    from app.utils.dbo import create_db_engine
+    tuned = create_db_engine(str(tmp_path / "tuned.db"), profile="tuned")
+    with tuned.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+        assert connection.exec_driver_sql("PRAGMA temp_store").scalar() == 2
+    tuned.dispose()
+
+    default = create_db_engine(str(tmp_path / "default.db"), profile="default")
+    with default.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "delete"
+    default.dispose()
+
+    with pytest.raises(ValueError):
+        create_db_engine(str(tmp_path / "other.db"), profile="nope")
+
+def test_find_conflict(in_memory_db):
+    """Test that find_conflict matches usernames case-insensitively and honors exclude_id."""
+    with Session(in_memory_db) as session:
+        user = User.create_user(session, "Test_User", "pass", "Gold 1", 8, uid="test_uid")
+        other = User.create_user(session, "other_user", "pass", "Gold 1", 8, uid="other_uid")
+
+        assert User.find_conflict(session, "test_user") == "username"
+        assert User.find_conflict(session, "new_user", uid="test_uid") == "uid"
+        assert User.find_conflict(session, "other_user", uid="test_uid") == "username"
+        assert User.find_conflict(session, "new_user", uid="new_uid") is None
+        assert User.find_conflict(session, "TEST_USER", uid="test_uid", exclude_id=user.id) is None
+
+        with pytest.raises(UserError, match="username already exists"):
+            User.create_user(session, "TEST_USER", "pass", "Gold 1", 8)
+        with pytest.raises(UserError, match="UID already exists"):
+            other.update_user(session, "other_user", "pass", "Gold 1", 8, uid="test_uid")
+        # Changing only the case of one's own username is not a conflict
+        user.update_user(session, "TEST_user", "pass", "Gold 1", 8, uid="test_uid")
+        assert user.username == "TEST_user"
+
+def test_update_user_by_id(in_memory_db):
+    """Test that update_user_by_id updates one row by primary key and reports conflicts."""
+    with Session(in_memory_db) as session:
+        user = User.create_user(session, "test_user", "pass", "Gold 1", 8, uid="test_uid", level=1)
+        User.create_user(session, "other_user", "pass", "Gold 1", 8, uid="other_uid")
+
+        updated = User.update_user_by_id(session, user.id, "renamed", "new_pass", "Gold 2", 9, uid=" new_uid ", level="5")
+        assert (updated.id, updated.username, updated.uid, updated.level, updated.rank_value) == (user.id, "renamed", "new_uid", 5, 9)
+        session.expire_all()
+        stored = session.get(User, user.id)
+        assert (stored.username, stored.password, stored.uid, stored.level, stored.rank) == ("renamed", "new_pass", "new_uid", 5, "Gold 2")
+
+        assert User.update_user_by_id(session, 9999, "ghost", "pass", "Gold 1", 8) is None
+        with pytest.raises(UserError, match="username already exists"):
+            User.update_user_by_id(session, user.id, "OTHER_USER", "pass", "Gold 1", 8)
+        with pytest.raises(UserError, match="UID already exists"):
+            User.update_user_by_id(session, user.id, "renamed", "pass", "Gold 1", 8, uid="other_uid")
+
+def test_update_user_by_id_maps_raced_unique_violations(in_memory_db, monkeypatch):
+    """Test that a UNIQUE violation from the UPDATE itself, after a lookup that raced, is reported like find_conflict."""
+    with Session(in_memory_db) as session:
+        user = User.create_user(session, "test_user", "pass", "Gold 1", 8, uid="test_uid")
+        User.create_user(session, "other_user", "pass", "Gold 1", 8, uid="other_uid")
+        monkeypatch.setattr(User, "find_conflict", classmethod(lambda cls, *args, **kwargs: None))
+
+        with pytest.raises(UserError, match="UID already exists"):
+            User.update_user_by_id(session, user.id, "test_user", "pass", "Gold 1", 8, uid="other_uid")
+        with pytest.raises(UserError, match="username already exists"):
+            User.update_user_by_id(session, user.id, "OTHER_USER", "pass", "Gold 1", 8)
+        assert session.get(User, user.id).uid == "test_uid"
+
+def test_update_user_by_id_keeps_case_duplicate_username(case_duplicates_db):
+    """Test that update_user_by_id saves a case-only duplicate without renaming it."""
+    with Session(case_duplicates_db) as session:
+        user = User.get_user_by_username(session, "alice", "uid2")
+        updated = User.update_user_by_id(session, user.id, "alice", "new_pass", "Gold 2", 7, uid="uid2")
+        assert (updated.username, updated.password) == ("alice", "new_pass")
+        with pytest.raises(UserError, match="username already exists"):
+            User.update_user_by_id(session, user.id, "Bob", "new_pass", "Gold 2", 7, uid="uid2")
+
+def test_delete_user_by_id(in_memory_db):
+    """Test that delete_user_by_id removes exactly the row with that id."""
+    with Session(in_memory_db) as session:
+        user = User.create_user(session, "test_user", "pass", "Gold 1", 8)
+        other = User.create_user(session, "other_user", "pass", "Gold 1", 8)
+
+        assert User.delete_user_by_id(session, user.id) is True
+        assert User.delete_user_by_id(session, user.id) is False
+        assert [u.id for u in session.exec(select(User)).all()] == [other.id]
+
+def test_update_users_rank(in_memory_db):
+    """Test that update_users_rank re-ranks exactly the listed users in one statement."""
+    with Session(in_memory_db) as session:
+        users = [User.create_user(session, f"test_user{i}", "pass", "Gold 1", 8, uid=f"uid{i}") for i in range(4)]
+        ids = [users[0].id, users[2].id]
+
+        updated = User.update_users_rank(session, ids + [9999], "Diamond 3", 13)
+        assert sorted((u.id, u.username, u.uid, u.rank, u.rank_value) for u in updated) == [
+            (users[0].id, "test_user0", "uid0", "Diamond 3", 13),
+            (users[2].id, "test_user2", "uid2", "Diamond 3", 13),
+        ]
+        session.expire_all()
+        assert [u.rank for u in session.exec(select(User).order_by(User.id)).all()] == ["Diamond 3", "Gold 1", "Diamond 3", "Gold 1"]
+        assert User.update_users_rank(session, [], "Gold 1", 8) == []
+
+def test_delete_users_by_id(in_memory_db):
+    """Test that delete_users_by_id removes the listed users and reports the count."""
+    with Session(in_memory_db) as session:
+        users = [User.create_user(session, f"test_user{i}", "pass", "Gold 1", 8) for i in range(4)]
+
+        assert User.delete_users_by_id(session, [users[1].id, users[3].id, 9999]) == 2
+        assert [u.id for u in session.exec(select(User).order_by(User.id)).all()] == [users[0].id, users[2].id]
+        assert User.delete_users_by_id(session, []) == 0
+
+def test_get_rows_projection(in_memory_db):
+    """Test that the projection searches return UserRow results matching the User searches."""
+    with Session(in_memory_db) as session:
+        User.create_user(session, "test_user1", "pass1", "Gold 1", 8, uid="uid1", level=3)
+        User.create_user(session, "test_user2", "pass2", "Diamond 1", 14)
+        User.create_user(session, "other", "pass3", "Silver 1", 6)
+
+        rows = User.get_rows_by_ranks(session, [6, 7, 8])
+        assert rows == [UserRow(1, "test_user1", "pass1", "uid1", 3, "Gold 1", 8), UserRow(3, "other", "pass3", None, None, "Silver 1", 6)]
+        assert [row.username for row in User.get_rows_by_username(session, "user")] == ["test_user1", "test_user2"]
+        assert [row.id for row in User.get_rows_by_username(session, "user", after_id=1, limit=1)] == [2]
+
+def test_get_rows_raise_query_errors(in_memory_db, monkeypatch):
+    """Test that the projection searches raise a failed query instead of returning an empty page."""
+    with Session(in_memory_db) as session:
+        def fail(*args, **kwargs):
+            raise OperationalError("SELECT", {}, Exception("no active connection"))
+        monkeypatch.setattr(session, "exec", fail)
+        with pytest.raises(OperationalError):
+            User.get_rows_by_ranks(session, [8])
+        with pytest.raises(OperationalError):
+            User.get_rows_by_username(session, "user")
+
+def test_writes_update_rank_index_before_invalidating(in_memory_db, monkeypatch):
+    """Test that every write changes the rank index before it starts a new result cache generation."""
+    from app.utils.dbo import rank_index
+    seen = []
+    monkeypatch.setattr(rank_index, "is_tracking", lambda bind: True)
+    monkeypatch.setattr(rank_index, "add", lambda user: seen.append(result_cache.generation))
+    monkeypatch.setattr(rank_index, "remove", lambda user_id: seen.append(result_cache.generation))
+    with Session(in_memory_db) as session:
+        user = User.create_user(session, "test_user", "pass", "Gold 1", 8)
+        assert result_cache.generation == seen[-1] + 1
+        User.update_user_by_id(session, user.id, "test_user", "pass", "Gold 2", 7)
+        assert result_cache.generation == seen[-1] + 1
+        User.update_users_rank(session, [user.id], "Gold 3", 6)
+        assert result_cache.generation == seen[-1] + 1
+        User.delete_users_by_id(session, [user.id])
+        assert result_cache.generation == seen[-1] + 1
+
+def test_username_cache_key_includes_search_index(in_memory_db):
+    """Test that trigram-index and LIKE username searches are cached separately."""
+    with Session(in_memory_db) as session:
+        User.create_user(session, "test_user1", "pass1", "Gold 1", 8)
+        misses = result_cache.misses
+        User.get_rows_by_username(session, "user", use_search_index=True)
+        User.get_rows_by_username(session, "user", use_search_index=False)
+        assert result_cache.misses == misses + 2
+
+def test_searches_use_result_cache(in_memory_db):
+    """Test that repeated searches are cache hits and that any write invalidates them."""
+    with Session(in_memory_db) as session:
+        user = User.create_user(session, "test_user1", "pass1", "Gold 1", 8)
+        first = User.get_rows_by_ranks(session, [8, 7])
+        hits = result_cache.hits
+        assert User.get_rows_by_ranks(session, [7, 8]) == first
+        assert User.get_rows_by_username(session, "TEST") == User.get_rows_by_username(session, "test")
+        assert result_cache.hits == hits + 2
+
+        User.update_user_by_id(session, user.id, "test_user1", "pass1", "Gold 2", 7)
+        assert [row.rank for row in User.get_rows_by_ranks(session, [7, 8])] == ["Gold 2"]
+        User.delete_user_by_id(session, user.id)
+        assert User.get_rows_by_username(session, "test") == []
@@ -0,0 +1,25 @@
+from benchmarks.dbo_suite import OPERATIONS, bench_size, compare, percentile
+from benchmarks.synthetic import generate_accounts
+
+
+def test_generate_accounts_is_deterministic_and_unique():
+    accounts = list(generate_accounts(500, seed=1))
+    assert accounts == list(generate_accounts(500, seed=1))
+    assert len({a[0] for a in accounts}) == 500
+    assert len({a[2] for a in accounts if a[2]}) == sum(1 for a in accounts if a[2])
+
+def test_bench_size_reports_every_operation():
+    """Test a tiny run end to end: every operation is timed the requested number of times."""
+    results = bench_size(50, iterations=5)
+    assert tuple(results) == OPERATIONS
+    for stats in results.values():
+        assert stats["calls"] == 5
+        assert 0 < stats["p50_ms"] <= stats["p99_ms"] <= stats["max_ms"]
+
+def test_compare_flags_regressions():
+    baseline = {"results": {"1000": {"create_user": {"p50_ms": 1.0, "p99_ms": 2.0}}}}
+    candidate = {"results": {"1000": {"create_user": {"p50_ms": 1.05, "p99_ms": 3.0}, "delete_user": {"p50_ms": 1.0, "p99_ms": 1.0}}}}
+    rows = compare(baseline, candidate, threshold=0.25)
+    assert [(r["metric"], r["regression"]) for r in rows] == [("p50_ms", False), ("p99_ms", True)]
+    assert percentile([1.0, 2.0, 3.0, 4.0], 0.5) == 2.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 0.99) == 4.0
@@ -0,0 +1,45 @@
+import gzip
+import logging
+from logging.handlers import QueueHandler
+from app.utils.logger import _resolve_level, create_file_handler, listener, logger
+
+
+def _record(message: str) -> logging.LogRecord:
+    return logging.LogRecord("test", logging.INFO, __file__, 0, message, None, None)
+
+def test_logger_writes_through_queue():
+    """Test that the app logger only enqueues and the listener owns the file handler."""
+    assert [type(h) for h in logger.handlers] == [QueueHandler]
+    assert listener.handlers and listener.respect_handler_level
+
+def test_rotation_with_compression(tmp_path):
+    """Test that the file rotates by size and rotated files are gzipped."""
+    path = tmp_path / "app.log"
+    handler = create_file_handler(str(path), max_bytes=200, backup_count=2, compress=True)
+    try:
+        for i in range(20):
+            handler.emit(_record(f"message {i:02d} " + "x" * 40))
+    finally:
+        handler.close()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["app.log", "app.log.1.gz", "app.log.2.gz"]
+    with gzip.open(tmp_path / "app.log.1.gz", "rt") as stream:
+        assert "message" in stream.read()
+
+def test_disabled_level_skips_formatting():
+    """Test that lazy %-style arguments are never formatted when the level is off."""
+    class Expensive:
+        formatted = False
+        def __str__(self):
+            Expensive.formatted = True
+            return "expensive"
+    level = logger.level
+    logger.setLevel(logging.INFO)
+    try:
+        logger.debug("value %s", Expensive())
+    finally:
+        logger.setLevel(level)
+    assert not Expensive.formatted
+
+def test_resolve_level():
+    assert _resolve_level("DEBUG") == logging.DEBUG
+    assert _resolve_level("nonsense") == logging.INFO
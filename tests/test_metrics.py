@@ -0,0 +1,64 @@
+import asyncio
+import json
+import pytest
+from app.utils.metrics import Metrics, OperationStats
+
+
+def test_ring_buffer_keeps_recent_latencies_only():
+    """Test that percentiles use the last `window` calls while counts and the histogram cover all."""
+    stats = OperationStats(window=3, buckets_ms=(1, 10))
+    for elapsed in (50.0, 0.5, 5.0, 5.0):
+        stats.record(elapsed)
+    summary = stats.summary()
+    assert list(stats.recent) == [0.5, 5.0, 5.0]
+    assert summary["count"] == 4 and summary["max_ms"] == 50.0
+    assert summary["p50_ms"] == 5.0
+    assert summary["histogram"] == {"<=1ms": 1, "<=10ms": 2, ">10ms": 1}
+
+def test_track_sync_async_and_errors():
+    """Test that the decorator times plain and coroutine functions and counts exceptions as errors."""
+    metrics = Metrics()
+
+    @metrics.track("sync")
+    def fail():
+        raise ValueError("boom")
+
+    @metrics.track("async")
+    async def work():
+        return 42
+
+    with pytest.raises(ValueError):
+        fail()
+    assert asyncio.run(work()) == 42
+    snapshot = metrics.snapshot()
+    assert snapshot["sync"]["count"] == 1 and snapshot["sync"]["errors"] == 1
+    assert snapshot["async"]["count"] == 1 and snapshot["async"]["errors"] == 0
+
+def test_cancelled_calls_are_not_recorded():
+    """Test that a cancelled coroutine, e.g. a superseded search, leaves no sample."""
+    metrics = Metrics()
+
+    @metrics.track("search")
+    async def slow():
+        await asyncio.sleep(10)
+
+    async def run():
+        task = asyncio.create_task(slow())
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert metrics.snapshot() == {}
+
+def test_dump_writes_json(tmp_path):
+    """Test that dump writes every operation summary as JSON."""
+    metrics = Metrics(window=8)
+    with metrics.timed("db.create_user"):
+        pass
+    path = tmp_path / "metrics.json"
+    metrics.dump(str(path))
+    data = json.loads(path.read_text())
+    assert data["window"] == 8
+    assert data["operations"]["db.create_user"]["count"] == 1
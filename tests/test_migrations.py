@@ -0,0 +1,69 @@
+import logging
+import pytest
+from sqlite3 import connect
+from app.utils.migrations import MIGRATIONS, SCHEMA_VERSION, Migration, get_version, migrate
+
+
+@pytest.fixture
+def legacy_db(tmp_path):
+    """A database from before usersv2, with only the old users table."""
+    conn = connect(tmp_path / "users.db")
+    conn.execute("CREATE TABLE users (username TEXT, password TEXT, rank TEXT, rank_value INTEGER)")
+    conn.executemany(
+        "INSERT INTO users VALUES (?, ?, ?, ?)",
+        [(f"test_user{i}", "pass", "Gold 1", 8) for i in range(12)],
+    )
+    conn.commit()
+    yield conn
+    conn.close()
+
+def test_migrate_legacy_database(legacy_db, monkeypatch, caplog):
+    """Test that migrate copies the legacy table in batches and stores the schema version."""
+    monkeypatch.setattr("app.utils.migrations.MIGRATION_BATCH_SIZE", 5)
+    assert get_version(legacy_db) == 0
+
+    with caplog.at_level(logging.INFO):
+        assert migrate(legacy_db) == SCHEMA_VERSION
+    assert [m for m in caplog.messages if m.startswith("Copied")] == [
+        "Copied 5 users from the old users table.",
+        "Copied 10 users from the old users table.",
+        "Copied 12 users from the old users table.",
+    ]
+    assert get_version(legacy_db) == SCHEMA_VERSION
+
+    tables = {row[0] for row in legacy_db.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    assert "users" not in tables
+    rows = legacy_db.execute("SELECT id, username FROM usersv2 ORDER BY id").fetchall()
+    assert rows == [(i + 1, f"test_user{i}") for i in range(12)]
+    search = legacy_db.execute("SELECT rowid FROM usersv2_search WHERE username LIKE '%user1%' ORDER BY rowid").fetchall()
+    assert search == [(2,), (11,), (12,)]
+    indexes = {row[0] for row in legacy_db.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+    assert {"ix_usersv2_username_nocase", "ix_usersv2_rank_value_username"} <= indexes
+
+    # Nothing is pending once the database is current
+    assert migrate(legacy_db) == SCHEMA_VERSION
+
+def test_failed_migration_rolls_back(legacy_db):
+    """Test that a failing step leaves the database at the previous version."""
+    def broken(conn):
+        conn.cursor().execute("CREATE TABLE half_done (id INTEGER)")
+        raise RuntimeError("boom")
+
+    migrations = MIGRATIONS + [Migration(SCHEMA_VERSION + 1, "broken", broken)]
+    with pytest.raises(RuntimeError):
+        migrate(legacy_db, migrations)
+
+    assert get_version(legacy_db) == SCHEMA_VERSION
+    tables = {row[0] for row in legacy_db.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    assert "half_done" not in tables
+
+def test_nocase_index_tolerates_existing_duplicates(legacy_db, caplog):
+    """Test that case-only duplicate usernames get a non-unique index instead of a failed migration."""
+    legacy_db.execute("INSERT INTO users VALUES ('TEST_USER1', 'pass', 'Gold 1', 8)")
+    legacy_db.commit()
+
+    with caplog.at_level(logging.WARNING):
+        assert migrate(legacy_db) == SCHEMA_VERSION
+    assert any("differing only in case" in m for m in caplog.messages)
+    index_sql = legacy_db.execute("SELECT sql FROM sqlite_master WHERE name='ix_usersv2_username_nocase'").fetchone()[0]
+    assert "UNIQUE" not in index_sql
@@ -0,0 +1,54 @@
+import pytest
+from sqlmodel import Session
+from app.utils.dbo import User, load_rank_index, rank_index
+from app.utils.party import _match_slots, assign_party_accounts, find_party_accounts, party_rank_values
+from app.utils.rank_utils import RANK_MAP
+
+
+@pytest.fixture
+def session(in_memory_db):
+    with Session(in_memory_db) as session:
+        for username, rank in [("bronze", "Bronze 1"), ("gold_a", "Gold 1"), ("gold_b", "Gold 1"), ("plat", "Platinum 2"), ("diamond", "Diamond 2")]:
+            User.create_user(session, username, "pass", rank, RANK_MAP[rank])
+        yield session
+    rank_index.clear()
+
+def test_find_party_accounts(session):
+    """Test that only accounts valid with every party member are returned."""
+    party = party_rank_values(["Gold 3", "Platinum 1"])
+    assert [u.username for u in find_party_accounts(session, party)] == ["gold_a", "gold_b"]
+    assert [u.username for u in find_party_accounts(session, party_rank_values(["Silver 2", "Gold 1"]))] == ["bronze", "gold_a", "gold_b"]
+    assert find_party_accounts(session, party_rank_values(["Bronze 3", "Diamond 1"])) == []
+    with pytest.raises(ValueError):
+        party_rank_values(["Tin 1"])
+
+def test_assign_party_accounts(session):
+    """Test that each party gets a distinct account and the assignment fills as many parties as possible."""
+    parties = [party_rank_values(["Gold 1"]), party_rank_values(["Gold 3", "Platinum 1"]), party_rank_values(["Platinum 1"])]
+    assigned = assign_party_accounts(session, parties)
+    assert None not in assigned
+    assert len({u.id for u in assigned}) == 3
+    assert assigned[1].username in ("gold_a", "gold_b")
+
+    # Two parties that only gold accounts fit, one more than there are left over
+    parties = [party_rank_values(["Gold 3", "Platinum 1"])] * 3
+    assigned = assign_party_accounts(session, parties)
+    assert sorted(u.username for u in assigned if u) == ["gold_a", "gold_b"]
+    assert assigned.count(None) == 1
+
+def test_get_rows_per_rank(session):
+    """Test that at most the given number of rows per rank value is loaded, lowest ids first, from SQL and from the index."""
+    for i in range(3):
+        User.create_user(session, f"gold_{i}", "pass", "Gold 1", RANK_MAP["Gold 1"])
+    limits = {RANK_MAP["Gold 1"]: 2, RANK_MAP["Bronze 1"]: 5, RANK_MAP["Silver 1"]: 1}
+    expected = ["bronze", "gold_a", "gold_b"]
+    assert [u.username for u in User.get_rows_per_rank(session, limits)] == expected
+
+    load_rank_index(session)
+    assert rank_index.is_active(session.get_bind())
+    assert [u.username for u in User.get_rows_per_rank(session, limits)] == expected
+
+def test_match_slots_reassigns():
+    """Test that an earlier slot is moved to free the only rank a later slot can use."""
+    # Slot 0 fits rank 1 or 2, slot 1 only rank 1; one account of each rank
+    assert _match_slots([0b110, 0b010], {1: 1, 2: 1}) == [2, 1]
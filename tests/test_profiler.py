@@ -0,0 +1,49 @@
+import asyncio
+import pstats
+from app.utils.profiler import HandlerProfiler
+
+
+def handler():
+    return sum(range(1000))
+
+def test_disabled_profiler_leaves_handlers_unwrapped(tmp_path):
+    """Test that wrap() is a no-op when profiling is off, so there is no per-call cost."""
+    profiler = HandlerProfiler(enabled=False, output_dir=str(tmp_path))
+    assert profiler.wrap()(handler) is handler
+    assert profiler.start("startup") is None
+    assert not list(tmp_path.iterdir())
+
+def test_profiles_are_sampled_and_capped(tmp_path):
+    """Test that every n-th call is profiled, each to its own file, up to max_files."""
+    profiler = HandlerProfiler(enabled=True, output_dir=str(tmp_path), sample_every=2, max_files=2)
+    wrapped = profiler.wrap()(handler)
+    for _ in range(7):
+        assert wrapped() == 499500
+    assert profiler.calls["handler"] == 3
+    assert len(profiler.written) == 2
+    assert sorted(p.name.split("-")[0] for p in tmp_path.iterdir()) == ["handler", "handler"]
+    stats = pstats.Stats(profiler.written[0])
+    assert any(function == "handler" for _, _, function in stats.stats)
+
+def test_nested_and_fast_calls_are_skipped(tmp_path):
+    """Test that a call starting during another profile is skipped and fast calls are not written."""
+    profiler = HandlerProfiler(enabled=True, output_dir=str(tmp_path), min_ms=60_000)
+
+    @profiler.wrap("outer")
+    async def outer():
+        await asyncio.sleep(0)
+        return profiler.wrap("inner")(handler)()
+
+    assert asyncio.run(outer()) == 499500
+    assert profiler.calls == {"outer": 1}
+    assert profiler.written == []
+
+def test_finish_stops_only_the_named_profile(tmp_path):
+    """Test that finish() ends a profile started elsewhere, like the startup span."""
+    profiler = HandlerProfiler(enabled=True, output_dir=str(tmp_path))
+    profiler.start("startup")
+    handler()
+    assert profiler.finish("other") is None
+    path = profiler.finish("startup")
+    assert path is not None and profiler.written == [path]
+    assert profiler.finish("startup") is None
@@ -0,0 +1,42 @@
+import subprocess
+import sys
+import pytest
+from sqlmodel import Session
+from app.utils.dbo import User
+from app.utils.quick_query import connect, users_by_party, users_by_rank, users_by_username
+
+
+@pytest.fixture
+def db_path(file_db):
+    with Session(file_db) as session:
+        User.create_user(session, "test_user1", "pass1", "Gold 1", 8, uid="uid1", level=3)
+        User.create_user(session, "Test_User2", "pass2", "Diamond 1", 14)
+        User.create_user(session, "other", "pass3", "Silver 1", 6)
+    return file_db.url.database
+
+def test_quick_query_matches_user_queries(db_path):
+    """Test that the sqlite3 lookups return the same accounts as the User queries."""
+    conn = connect(db_path)
+    try:
+        assert [row["username"] for row in users_by_rank(conn, "gold 2")] == ["test_user1", "other"]
+        assert [row["username"] for row in users_by_username(conn, "USER")] == ["test_user1", "Test_User2"]
+        assert [row["username"] for row in users_by_username(conn, "th")] == ["other"]
+        assert [row["username"] for row in users_by_party(conn, ["gold 3", "Platinum 1"])] == ["test_user1"]
+        with pytest.raises(ValueError):
+            users_by_rank(conn, "Tin 1")
+        with pytest.raises(ValueError):
+            users_by_party(conn, ["Gold 3", "Tin 1"])
+    finally:
+        conn.close()
+
+def test_quick_query_missing_database(tmp_path):
+    """Test that connect does not create a database that does not exist."""
+    with pytest.raises(Exception):
+        connect(str(tmp_path / "missing.db"))
+    assert not (tmp_path / "missing.db").exists()
+
+def test_cli_does_not_import_tui_or_orm():
+    """Test that the command line module stays free of Textual and SQLModel imports."""
+    code = "import sys, app.cli; print(any(m.split('.')[0] in ('textual', 'sqlmodel', 'sqlalchemy') for m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,144 @@
+import pytest
+from sqlmodel import Session
+from app.utils.dbo import User, rank_index, load_rank_index
+from app.utils.rank_index import RankIndex
+from app.utils.user_row import UserRow
+
+
+@pytest.fixture
+def indexed_db(in_memory_db):
+    """Create an in-memory database with the global rank index loaded from it."""
+    with Session(in_memory_db) as session:
+        User.create_user(session, "test_user1", "pass1", "Gold 1", 11, uid="test_uid1", level=1)
+        User.create_user(session, "test_user2", "pass2", "Gold 2", 10, uid="test_uid2")
+        User.create_user(session, "test_user3", "pass3", "Platinum 1", 14, level=20)
+        load_rank_index(session)
+    yield in_memory_db
+    rank_index.clear()
+
+def test_rank_index_buckets():
+    """Test that RankIndex groups users by rank and merges buckets in id order."""
+    index = RankIndex()
+    index.load("bind", [
+        User(id=3, username="c", password="p", rank="Gold 1", rank_value=11),
+        User(id=1, username="a", password="p", rank="Gold 2", rank_value=10),
+        User(id=2, username="b", password="p", rank="Platinum 1", rank_value=14),
+    ])
+    assert len(index) == 3
+    assert [u.id for u in index.get([10, 11])] == [1, 3]
+    assert index.get([0]) == []
+    assert index.is_active("bind")
+    assert not index.is_active("other_bind")
+
+    index.add(User(id=1, username="a", password="p", rank="Platinum 1", rank_value=14))
+    assert [u.id for u in index.get([14])] == [1, 2]
+    assert [u.id for u in index.get([10])] == []
+
+    index.remove(2)
+    assert [u.id for u in index.get([14])] == [1]
+
+    index.enabled = False
+    assert not index.is_active("bind")
+
+def test_get_rows_by_ranks_uses_index(indexed_db):
+    """Test that row searches are answered from the index once it is loaded, while User searches still query."""
+    with Session(indexed_db) as session:
+        assert rank_index.is_active(session.get_bind())
+        results = User.get_rows_by_ranks(session, [10, 11])
+        assert [r.username for r in results] == ["test_user1", "test_user2"]
+        assert all(isinstance(r, UserRow) for r in results)
+
+        users = User.get_users_by_ranks(session, [10, 11])
+        assert sorted(u.username for u in users) == ["test_user1", "test_user2"]
+        assert all(isinstance(u, User) for u in users)
+
+def test_rank_index_tracks_writes(indexed_db):
+    """Test that create_user, update_user and delete_user keep the index in sync."""
+    with Session(indexed_db) as session:
+        User.create_user(session, "test_user4", "pass4", "Gold 3", 9)
+        assert "test_user4" in [r.username for r in User.get_rows_by_ranks(session, [9])]
+
+        user = User.get_user_by_username(session, "test_user1", "test_uid1")
+        user.update_user(session, "renamed", "pass1", "Silver 1", 6, uid="test_uid1", level=1)
+        assert [r.username for r in User.get_rows_by_ranks(session, [11])] == []
+        assert [r.username for r in User.get_rows_by_ranks(session, [6])] == ["renamed"]
+
+        assert User.delete_user(session, "test_user2", "pass2", "Gold 2", 10, uid="test_uid2")
+        assert User.get_rows_by_ranks(session, [10]) == []
+        assert len(rank_index) == 3
+
+def test_rank_index_switch_falls_back_to_query(indexed_db):
+    """Test that disabling the index sends rank searches back to the database."""
+    rank_index.enabled = False
+    try:
+        with Session(indexed_db) as session:
+            assert not rank_index.is_active(session.get_bind())
+            results = User.get_rows_by_ranks(session, [10, 11])
+            assert sorted(r.username for r in results) == ["test_user1", "test_user2"]
+    finally:
+        rank_index.enabled = True
+
+def test_rank_index_pages():
+    """Test that RankIndex.get returns keyset pages of the merged buckets."""
+    index = RankIndex()
+    index.load("bind", [
+        User(id=i, username=f"u{i}", password="p", rank="Gold 1", rank_value=10 + i % 3) for i in range(1, 8)
+    ])
+    assert [u.id for u in index.get([10, 11], limit=2)] == [1, 3]
+    assert [u.id for u in index.get([10, 11], after_id=3, limit=2)] == [4, 6]
+    assert [u.id for u in index.get([10, 11], after_id=5)] == [6, 7]
+
+def test_update_user_by_id_keeps_index_for_any_level(indexed_db):
+    """Test that a committed update with a non-numeric level is returned and indexed instead of raising."""
+    with Session(indexed_db) as session:
+        user = User.get_user_by_username(session, "test_user1", "test_uid1")
+        updated = User.update_user_by_id(session, user.id, "renamed", "pass1", "Silver 1", 6, uid="test_uid1", level="xyz")
+        assert (updated.id, updated.username, updated.level) == (user.id, "renamed", "xyz")
+        assert [(r.username, r.level) for r in User.get_rows_by_ranks(session, [6])] == [("renamed", "xyz")]
+        assert User.get_rows_by_ranks(session, [11]) == []
+
+def test_update_users_rank_keeps_index_for_any_level(indexed_db):
+    """Test that a batch rank change of a user with a non-numeric level updates the index instead of raising."""
+    with Session(indexed_db) as session:
+        user = User.create_user(session, "test_user4", "pass4", "Gold 1", 11, level="abc")
+        users = User.update_users_rank(session, [user.id], "Gold 2", 10)
+        assert [(u.id, u.rank, u.level) for u in users] == [(user.id, "Gold 2", "abc")]
+        assert user.id not in [r.id for r in User.get_rows_by_ranks(session, [11])]
+        assert user.id in [r.id for r in User.get_rows_by_ranks(session, [10])]
+
+def test_writes_during_load_are_replayed():
+    """Test that writes logged between start_loading and load are applied on top of the loaded rows."""
+    index = RankIndex()
+    index.start_loading("bind")
+    assert index.is_tracking("bind") and not index.is_active("bind")
+    assert not index.is_tracking("other_bind")
+    # Committed after the loading SELECT ran, so missing from the rows passed to load()
+    index.add(User(id=4, username="d", password="p", rank="Gold 1", rank_value=11))
+    index.remove(2)
+    index.add(User(id=1, username="a", password="p", rank="Platinum 1", rank_value=14))
+    index.load("bind", [
+        User(id=1, username="a", password="p", rank="Gold 2", rank_value=10),
+        User(id=2, username="b", password="p", rank="Gold 2", rank_value=10),
+    ])
+    assert index.is_active("bind")
+    assert [u.id for u in index.get([10, 11, 14])] == [1, 4]
+    assert index.get([10]) == []
+
+def test_load_rank_index_keeps_concurrent_writes(file_db, monkeypatch):
+    """Test that a create committed while load_rank_index is reading ends up in the index."""
+    original_load = rank_index.load
+
+    def load_after_write(bind, users):
+        users = list(users)
+        with Session(file_db) as other:
+            User.create_user(other, "late_user", "pass", "Gold 1", 11)
+        original_load(bind, users)
+
+    monkeypatch.setattr(rank_index, "load", load_after_write)
+    try:
+        with Session(file_db) as session:
+            User.create_user(session, "early_user", "pass", "Gold 1", 11)
+            load_rank_index(session)
+            assert sorted(r.username for r in User.get_rows_by_ranks(session, [11])) == ["early_user", "late_user"]
+    finally:
+        rank_index.clear()
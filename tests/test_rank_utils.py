@@ -0,0 +1,48 @@
+from app.utils.rank_utils import (
+    RANKS, RANK_MAP, RANK_WINDOWS, VALID_RANKS, as_window, get_valid_ranks, mask_ranks, match_party, match_rank,
+    party_mask, rank_window, valid_rank_mask,
+)
+
+
+def test_valid_ranks_follow_tier_rules():
+    """Test the precomputed windows for each tier."""
+    assert get_valid_ranks(RANK_MAP["Bronze 3"]) == tuple(range(0, 9))
+    assert get_valid_ranks(RANK_MAP["Silver 1"]) == tuple(range(0, 9))
+    assert get_valid_ranks(RANK_MAP["Gold 2"]) == tuple(range(0, 11))
+    assert get_valid_ranks(RANK_MAP["Platinum 3"]) == tuple(range(6, 13))
+    assert get_valid_ranks(RANK_MAP["Celestial 1"]) == tuple(range(17, 21))
+    assert len(VALID_RANKS) == len(RANKS)
+
+def test_masks_and_windows_match_valid_ranks():
+    """Test that the bitmask and range forms describe the same rank values."""
+    for value in range(len(RANKS)):
+        ranks = get_valid_ranks(value)
+        assert [rank for rank in range(len(RANKS)) if valid_rank_mask(value) >> rank & 1] == list(ranks)
+        assert rank_window(value) == (ranks[0], ranks[-1])
+    # quick_query relies on every window being one range
+    assert None not in RANK_WINDOWS
+
+def test_as_window():
+    assert as_window((3, 4, 5)) == (3, 5)
+    assert as_window([5, 3, 4]) == (3, 5)
+    assert as_window((3, 5)) is None
+    assert as_window((3, 3, 4)) is None
+    assert as_window(()) is None
+
+def test_match_rank():
+    assert match_rank(" gold 2 ") == "Gold 2"
+    assert match_rank("Tin 1") is None
+
+def test_party_mask():
+    """Test that a party's mask keeps only the ranks valid with every member."""
+    gold_3, platinum_1, silver_2 = RANK_MAP["Gold 3"], RANK_MAP["Platinum 1"], RANK_MAP["Silver 2"]
+    assert mask_ranks(party_mask([gold_3])) == get_valid_ranks(gold_3)
+    assert mask_ranks(party_mask([gold_3, platinum_1])) == (8, 9)
+    assert mask_ranks(party_mask([gold_3, platinum_1, silver_2])) == (8,)
+    assert party_mask([RANK_MAP["Bronze 3"], RANK_MAP["Diamond 1"]]) == 0
+    assert party_mask([]) == 0
+
+def test_match_party():
+    assert match_party("gold 3, Platinum 1 ,silver 2") == ["Gold 3", "Platinum 1", "Silver 2"]
+    assert match_party("Gold 3") is None
+    assert match_party("Gold 3, Tin 1") is None
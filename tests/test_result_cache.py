@@ -0,0 +1,54 @@
+from app.utils.result_cache import ResultCache, result_size
+from app.utils.user_row import UserRow
+
+
+def _rows(count: int) -> list[UserRow]:
+    return [UserRow(i, f"user{i}", "pass", None, None, "Gold 1", 8) for i in range(count)]
+
+def test_lru_eviction_by_entries():
+    """Test that the least recently used entry is evicted first."""
+    cache = ResultCache(max_entries=2, max_bytes=1 << 20)
+    for key in ("a", "b"):
+        cache.put(key, _rows(1), cache.generation)
+    cache.get("a")
+    cache.put("c", _rows(1), cache.generation)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+def test_eviction_by_bytes():
+    """Test that the byte bound evicts old entries and refuses results larger than the bound."""
+    rows = _rows(10)
+    cache = ResultCache(max_entries=100, max_bytes=result_size(rows) * 2)
+    for key in range(3):
+        cache.put(key, rows, cache.generation)
+    assert len(cache) == 2 and cache.bytes <= cache.max_bytes
+    cache.put("big", _rows(100), cache.generation)
+    assert cache.get("big") is None
+
+def test_generation_invalidation():
+    """Test that a write drops every entry and that results computed before it are not stored."""
+    cache = ResultCache(max_entries=10, max_bytes=1 << 20)
+    cache.put("a", _rows(1), cache.generation)
+    generation = cache.generation
+    cache.invalidate()
+    assert cache.get("a") is None
+    cache.put("b", _rows(1), generation)
+    assert cache.get("b") is None
+    assert cache.stats() | {"bytes": 0} == {
+        "entries": 0, "bytes": 0, "generation": 1, "hits": 0, "misses": 2, "hit_rate": 0.0, "evictions": 0,
+    }
+
+def test_hits_return_copies():
+    """Test that mutating a returned list does not change the cached result."""
+    cache = ResultCache(max_entries=10, max_bytes=1 << 20)
+    cache.put("a", _rows(2), cache.generation)
+    cache.get("a").clear()
+    assert len(cache.get("a")) == 2
+    assert cache.stats()["hit_rate"] == 1.0
+
+def test_disabled_cache():
+    """Test that a disabled cache never stores or counts lookups."""
+    cache = ResultCache(max_entries=10, max_bytes=1 << 20, enabled=False)
+    cache.put("a", _rows(1), cache.generation)
+    assert cache.get("a") is None and cache.stats()["misses"] == 0
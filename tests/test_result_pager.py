@@ -0,0 +1,48 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session
+from app.utils.dbo import User
+from app.utils.result_pager import ResultPager
+
+
+def test_result_pager_walks_all_pages(in_memory_db):
+    """Test that ResultPager fetches consecutive windows until the search is exhausted."""
+    with Session(in_memory_db) as session:
+        for i in range(5):
+            User.create_user(session, f"test_user{i}", "pass", "Gold 1", 10)
+
+        pager = ResultPager(lambda s, after_id, limit: User.get_users_by_ranks(s, [10], after_id=after_id, limit=limit), page_size=2)
+        pages = [pager.next_page(session) for _ in range(3)]
+
+        assert [len(page) for page in pages] == [2, 2, 1]
+        assert pager.exhausted
+        assert pager.next_page(session) == []
+        assert [u.username for page in pages for u in page] == [f"test_user{i}" for i in range(5)]
+
+def test_result_pager_is_loaded():
+    """Test that is_loaded reports whether an id falls inside the fetched pages."""
+    pager = ResultPager(lambda s, after_id, limit: [User(id=i, username="u", password="p", rank="Gold 1", rank_value=10) for i in (1, 2)], page_size=2)
+    assert not pager.is_loaded(1)
+    pager.next_page(None)
+    assert pager.is_loaded(2)
+    assert not pager.is_loaded(3)
+    pager.exhausted = True
+    assert pager.is_loaded(3)
+
+def test_result_pager_failed_fetch_is_not_the_end():
+    """Test that a fetch error reaches the caller without marking the search exhausted."""
+    rows = [User(id=i, username="u", password="p", rank="Gold 1", rank_value=10) for i in (1, 2, 3)]
+    failures = [OperationalError("SELECT", {}, Exception("no active connection"))]
+
+    def fetch(session, after_id, limit):
+        if after_id is not None and failures:
+            raise failures.pop()
+        return [row for row in rows if after_id is None or row.id > after_id][:limit]
+
+    pager = ResultPager(fetch, page_size=2)
+    assert [u.id for u in pager.next_page(None)] == [1, 2]
+    with pytest.raises(OperationalError):
+        pager.next_page(None)
+    assert not pager.exhausted and pager.last_id == 2
+    assert [u.id for u in pager.next_page(None)] == [3]
+    assert pager.exhausted
@@ -0,0 +1,171 @@
+import asyncio
+import pytest
+from sqlmodel import Session
+from textual.widgets import Input, Select
+from app import rivals_viewer
+from app.rivals_viewer import SEARCH_DEBOUNCE, RivalsSmurfTracker
+from app.utils import async_dbo
+from app.utils.async_dbo import create_async_db_engine
+from app.utils.dbo import User, create_db_engine, init_db, rank_index
+from app.utils.stretchy_datatable import StretchyDataTable
+
+
+@pytest.fixture
+def viewer_db(tmp_path):
+    """Create a migrated database file with five Gold 1 accounts."""
+    path = str(tmp_path / "users.db")
+    sync_engine = create_db_engine(path)
+    init_db(sync_engine)
+    with Session(sync_engine) as session:
+        for i in range(5):
+            User.create_user(session, f"acc{i}", "pass", "Gold 1", 8)
+    yield sync_engine
+    sync_engine.dispose()
+    rank_index.clear()
+
+@pytest.fixture(autouse=True)
+def app_engine(viewer_db, monkeypatch):
+    """Give each test its own aiosqlite engine, disposed by the app on unmount."""
+    db_engine = create_async_db_engine(viewer_db.url.database)
+    monkeypatch.setattr(async_dbo, "async_engine", db_engine)
+    monkeypatch.setattr(rivals_viewer, "async_engine", db_engine)
+
+async def settle(app, pilot) -> None:
+    await app.workers.wait_for_complete()
+    await pilot.pause()
+
+async def search(app, pilot, query: str) -> StretchyDataTable:
+    app.query_one("#search", Input).value = query
+    app.search_entries()
+    await settle(app, pilot)
+    return app.query_one(StretchyDataTable)
+
+def usernames(table: StretchyDataTable) -> list[str]:
+    return [table.get_row_at(i)[0] for i in range(table.row_count)]
+
+def test_typing_supersedes_the_running_search():
+    """Test that a keystroke drops and interrupts the running search before the debounce runs the new one."""
+    class Connection:
+        interrupted = False
+
+        async def interrupt(self):
+            self.interrupted = True
+
+    async def run():
+        app = RivalsSmurfTracker()
+        async with app.run_test() as pilot:
+            await settle(app, pilot)
+            app.query_one("#search", Input).value = "acc"
+            await pilot.pause(SEARCH_DEBOUNCE + 0.1)
+            await settle(app, pilot)
+            table = app.query_one(StretchyDataTable)
+            assert table.row_count == 5
+
+            connection = app._search_connection = Connection()
+            generation = app._search_generation
+            app.query_one("#search", Input).value = "acc1"
+            await settle(app, pilot)
+            assert connection.interrupted
+            assert app._search_generation > generation
+            # Results of the superseded search are ignored when they arrive
+            app.show_results(app.search_pager("acc"), [], generation)
+            assert table.row_count == 5
+
+            await pilot.pause(SEARCH_DEBOUNCE + 0.1)
+            await settle(app, pilot)
+            assert [table.get_row_at(i)[0] for i in range(table.row_count)] == ["acc1"]
+    asyncio.run(run())
+
+def test_writes_update_results_in_place(viewer_db):
+    """Test that apply_user_change updates, removes and appends result rows without re-running the search."""
+    async def run():
+        app = RivalsSmurfTracker(incremental_search=False)
+        async with app.run_test() as pilot:
+            await settle(app, pilot)
+            table = await search(app, pilot, "acc")
+            assert usernames(table) == ["acc0", "acc1", "acc2", "acc3", "acc4"]
+            generation = app._search_generation
+
+            table.move_cursor(row=2)
+            app.query_one("#edit_username", Input).value = "acc2x"
+            app.query_one("#edit_password", Input).value = "pass"
+            app.query_one("#edit_rank", Select).value = "Gold 2"
+            app.save_edit()
+            await settle(app, pilot)
+            assert table.get_row_at(2) == ["acc2x", "pass", None, None, "Gold 2"]
+
+            # No longer matches the search, so the row goes
+            table.move_cursor(row=0)
+            app.query_one("#edit_username", Input).value = "renamed"
+            app.save_edit()
+            await settle(app, pilot)
+            assert usernames(table) == ["acc1", "acc2x", "acc3", "acc4"]
+
+            app.query_one("#username", Input).value = "acc5"
+            app.query_one("#password", Input).value = "pass"
+            app.query_one("#rank", Select).value = "Gold 1"
+            app.store_entry()
+            await settle(app, pilot)
+            assert usernames(table) == ["acc1", "acc2x", "acc3", "acc4", "acc5"]
+
+            table.move_cursor(row=0)
+            app.delete_entry()
+            await settle(app, pilot)
+            assert usernames(table) == ["acc2x", "acc3", "acc4", "acc5"]
+            assert app._search_generation == generation
+    asyncio.run(run())
+
+    with Session(viewer_db) as session:
+        assert [u.username for u in User.get_users_by_username(session, "")] == ["renamed", "acc2x", "acc3", "acc4", "acc5"]
+
+def test_batch_edit_and_delete_selected_rows(viewer_db):
+    """Test that space selects several rows and Save Changes/Delete apply to all of them at once."""
+    async def run():
+        app = RivalsSmurfTracker(incremental_search=False)
+        async with app.run_test() as pilot:
+            await settle(app, pilot)
+            table = await search(app, pilot, "acc")
+            table.focus()
+            for row in (1, 3):
+                table.move_cursor(row=row)
+                await pilot.press("space")
+            assert table.selected_keys == {table.coordinate_to_cell_key((row, 0)).row_key.value for row in (1, 3)}
+            assert app.query_one("#edit_container").display
+
+            app.query_one("#edit_rank", Select).value = "Platinum 1"
+            app.save_edit()
+            await settle(app, pilot)
+            assert [table.get_row_at(i)[4] for i in range(table.row_count)] == ["Gold 1", "Platinum 1", "Gold 1", "Platinum 1", "Gold 1"]
+            assert table.selected_keys == set()
+
+            for row in (0, 4):
+                table.move_cursor(row=row)
+                await pilot.press("space")
+            app.delete_entry()
+            await settle(app, pilot)
+            assert usernames(table) == ["acc1", "acc2", "acc3"]
+            assert table.selected_keys == set()
+    asyncio.run(run())
+
+    with Session(viewer_db) as session:
+        assert [(u.username, u.rank_value) for u in User.get_users_by_username(session, "")] == [("acc1", 11), ("acc2", 8), ("acc3", 11)]
+
+def test_rapid_near_end_loads_every_page(viewer_db):
+    """Test that NearEnd bursts while a page is loading neither cancel it nor cut the results short."""
+    with Session(viewer_db) as session:
+        session.add_all(User(username=f"acc{i}", password="pass", rank="Gold 1", rank_value=8) for i in range(5, 2000))
+        session.commit()
+
+    async def run():
+        app = RivalsSmurfTracker(incremental_search=False)
+        async with app.run_test() as pilot:
+            await settle(app, pilot)
+            table = await search(app, pilot, "acc")
+            while not app._pager.exhausted:
+                for _ in range(5):
+                    table.post_message(StretchyDataTable.NearEnd(table))
+                    await asyncio.sleep(0.002)
+                await settle(app, pilot)
+            assert table.row_count == 2000
+            assert app._pager.last_id == 2000
+    asyncio.run(run())
@@ -0,0 +1,18 @@
+from app.utils.stretchy_datatable import allocate_widths
+
+
+def test_spare_width_is_shared_evenly():
+    """Test that every column gets its content width plus an even share of what is left."""
+    assert allocate_widths([8, 8, 3, 5, 4], 102) == [23, 23, 18, 20, 18]
+    assert sum(allocate_widths([10, 1, 1], 20)) == 20
+
+def test_only_widest_columns_are_truncated():
+    """Test that narrow columns keep their content width when the table is too narrow."""
+    widths = allocate_widths([28, 8, 9, 5, 6], 52)
+    assert widths == [24, 8, 9, 5, 6]
+    assert allocate_widths([30, 30, 4], 40) == [18, 18, 4]
+
+def test_degenerate_sizes():
+    """Test no columns, and a width smaller than one cell per column."""
+    assert allocate_widths([], 50) == []
+    assert allocate_widths([10, 10, 10], 0) == [1, 1, 1]
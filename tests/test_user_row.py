@@ -0,0 +1,14 @@
+import dataclasses
+import pytest
+from app.utils.dbo import User
+from app.utils.user_row import UserRow
+
+
+def test_user_row_is_compact_and_read_only():
+    """Test that UserRow has no per-instance dict and cannot be modified."""
+    row = UserRow.from_user(User(id=1, username="a", password="p", uid=None, level=3, rank="Gold 1", rank_value=8))
+    assert row == UserRow(1, "a", "p", None, 3, "Gold 1", 8)
+    assert not hasattr(row, "__dict__")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        row.username = "b"
+    assert UserRow.from_rows([(2, "b", "p", "uid", None, "Gold 2", 7)]) == [UserRow(2, "b", "p", "uid", None, "Gold 2", 7)]